@@ -43,6 +43,9 @@ async def lifespan(app: FastAPI):
             except Exception as e:
                 logger.error("Failed to start process", name=process_config.name, error=str(e))
     
+    # Drop old logs and metrics periodically
+    scheduler.enable_retention(config.global_config.log_retention_days)
+    
     # Start scheduler
     scheduler.start()
     logger.info("Scheduler started")
@@ -55,12 +58,8 @@ async def lifespan(app: FastAPI):
     # Stop scheduler
     scheduler.stop()
     
-    # Stop all processes
-    for process in process_manager.get_all_processes():
-        try:
-            process_manager.stop_process(process.name)
-        except Exception as e:
-            logger.error("Error stopping process", name=process.name, error=str(e))
+    # Stop all processes, pending restarts and the monitor threads
+    process_manager.close()
 
 
 app = FastAPI(
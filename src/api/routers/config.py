@@ -1,21 +1,21 @@
 """Configuration management API endpoints."""
 
 from typing import Dict, Any
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 import structlog
 
 from src.api.models.responses import MessageResponse, ConfigValidationResponse
 from src.api.deps import get_config_manager
+from src.config.config_manager import ConfigManager
 
 router = APIRouter()
 logger = structlog.get_logger()
 
 
 @router.get("/", response_model=Dict[str, Any])
-async def get_config():
+async def get_config(config_manager: ConfigManager = Depends(get_config_manager)):
     """Get current configuration."""
     try:
-        config_manager = get_config_manager()
         config = config_manager.get_config()
         return config_manager.export_config()
     except Exception as e:
@@ -24,10 +24,12 @@ async def get_config():
 
 
 @router.put("/", response_model=MessageResponse)
-async def update_config(config_data: Dict[str, Any]):
+async def update_config(
+    config_data: Dict[str, Any],
+    config_manager: ConfigManager = Depends(get_config_manager),
+):
     """Update configuration."""
     try:
-        config_manager = get_config_manager()
         # Import new config
         config_manager.import_config(config_data)
         
@@ -53,10 +55,9 @@ async def update_config(config_data: Dict[str, Any]):
 
 
 @router.post("/validate", response_model=ConfigValidationResponse)
-async def validate_config():
+async def validate_config(config_manager: ConfigManager = Depends(get_config_manager)):
     """Validate current configuration."""
     try:
-        config_manager = get_config_manager()
         errors = config_manager.validate_config()
         return ConfigValidationResponse(
             valid=len(errors) == 0,
@@ -68,10 +69,9 @@ async def validate_config():
 
 
 @router.post("/reload", response_model=MessageResponse)
-async def reload_config():
+async def reload_config(config_manager: ConfigManager = Depends(get_config_manager)):
     """Reload configuration from file."""
     try:
-        config_manager = get_config_manager()
         # Reload config
         config = config_manager.load_config()
         
@@ -95,10 +95,9 @@ async def reload_config():
 
 
 @router.get("/export", response_model=Dict[str, Any])
-async def export_config():
+async def export_config(config_manager: ConfigManager = Depends(get_config_manager)):
     """Export configuration as JSON."""
     try:
-        config_manager = get_config_manager()
         return config_manager.export_config()
     except Exception as e:
         logger.error("Failed to export configuration", error=str(e))
@@ -106,10 +105,12 @@ async def export_config():
 
 
 @router.post("/import", response_model=MessageResponse)
-async def import_config(config_data: Dict[str, Any]):
+async def import_config(
+    config_data: Dict[str, Any],
+    config_manager: ConfigManager = Depends(get_config_manager),
+):
     """Import configuration from JSON."""
     try:
-        config_manager = get_config_manager()
         # Import config
         config_manager.import_config(config_data)
         
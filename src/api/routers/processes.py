@@ -1,23 +1,23 @@
 """Process management API endpoints."""
 
 from typing import List
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 import structlog
 
 from src.api.models.requests import ProcessCreateRequest
 from src.api.models.responses import ProcessResponse, MessageResponse
 from src.api.deps import get_process_manager, get_config_manager
-from src.config.config_manager import ProcessConfig
+from src.config.config_manager import ConfigManager, ProcessConfig
+from src.core.process_manager import ProcessManager
 
 router = APIRouter()
 logger = structlog.get_logger()
 
 
 @router.get("/", response_model=List[ProcessResponse])
-async def list_processes():
+async def list_processes(process_manager: ProcessManager = Depends(get_process_manager)):
     """Get all processes."""
     try:
-        process_manager = get_process_manager()
         processes = process_manager.get_all_processes()
         return [
             ProcessResponse(
@@ -39,9 +39,8 @@ async def list_processes():
 
 
 @router.get("/{name}", response_model=ProcessResponse)
-async def get_process(name: str):
+async def get_process(name: str, process_manager: ProcessManager = Depends(get_process_manager)):
     """Get a specific process by name."""
-    process_manager = get_process_manager()
     process = process_manager.get_process(name)
     if not process:
         raise HTTPException(status_code=404, detail=f"Process '{name}' not found")
@@ -60,7 +59,11 @@ async def get_process(name: str):
 
 
 @router.post("/", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
-async def create_process(request: ProcessCreateRequest):
+async def create_process(
+    request: ProcessCreateRequest,
+    process_manager: ProcessManager = Depends(get_process_manager),
+    config_manager: ConfigManager = Depends(get_config_manager),
+):
     """Create a new process."""
     try:
         # Create process config
@@ -74,7 +77,6 @@ async def create_process(request: ProcessCreateRequest):
         )
         
         # Add to process manager
-        process_manager = get_process_manager()
         process_manager.add_process(
             name=config.name,
             command=config.command,
@@ -83,7 +85,6 @@ async def create_process(request: ProcessCreateRequest):
         )
         
         # Save to config
-        config_manager = get_config_manager()
         config_manager.add_process(config)
         config_manager.save_config()
         
@@ -98,10 +99,9 @@ async def create_process(request: ProcessCreateRequest):
 
 
 @router.post("/{name}/start", response_model=MessageResponse)
-async def start_process(name: str):
+async def start_process(name: str, process_manager: ProcessManager = Depends(get_process_manager)):
     """Start a process."""
     try:
-        process_manager = get_process_manager()
         success = process_manager.start_process(name)
         if not success:
             raise HTTPException(status_code=400, detail=f"Failed to start process '{name}'")
@@ -117,10 +117,9 @@ async def start_process(name: str):
 
 
 @router.post("/{name}/stop", response_model=MessageResponse)
-async def stop_process(name: str):
+async def stop_process(name: str, process_manager: ProcessManager = Depends(get_process_manager)):
     """Stop a process."""
     try:
-        process_manager = get_process_manager()
         success = process_manager.stop_process(name)
         if not success:
             raise HTTPException(status_code=400, detail=f"Failed to stop process '{name}'")
@@ -136,10 +135,12 @@ async def stop_process(name: str):
 
 
 @router.post("/{name}/restart", response_model=MessageResponse)
-async def restart_process(name: str):
+async def restart_process(
+    name: str,
+    process_manager: ProcessManager = Depends(get_process_manager),
+):
     """Restart a process."""
     try:
-        process_manager = get_process_manager()
         success = process_manager.restart_process(name)
         if not success:
             raise HTTPException(status_code=400, detail=f"Failed to restart process '{name}'")
@@ -155,10 +156,13 @@ async def restart_process(name: str):
 
 
 @router.delete("/{name}", response_model=MessageResponse)
-async def delete_process(name: str):
+async def delete_process(
+    name: str,
+    process_manager: ProcessManager = Depends(get_process_manager),
+    config_manager: ConfigManager = Depends(get_config_manager),
+):
     """Delete a process."""
     try:
-        process_manager = get_process_manager()
         # Stop process if running
         process_manager.stop_process(name)
         
@@ -168,7 +172,6 @@ async def delete_process(name: str):
             raise HTTPException(status_code=404, detail=f"Process '{name}' not found")
         
         # Remove from config
-        config_manager = get_config_manager()
         config_manager.remove_process(name)
         config_manager.save_config()
         
@@ -1,12 +1,13 @@
 """Restart policy management API endpoints."""
 
 from typing import List
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 import structlog
 
 from src.api.models.requests import RestartPolicyCreateRequest
 from src.api.models.responses import RestartPolicyResponse, MessageResponse
-from src.config.config_manager import RestartPolicyConfig
+from src.api.deps import get_config_manager
+from src.config.config_manager import ConfigManager, RestartPolicyConfig
 from src.models.models import RestartPolicyModel as RestartPolicy
 from src.models.base import SessionLocal
 
@@ -159,7 +160,10 @@ async def get_restart_policy(process_name: str):
 
 
 @router.post("/", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
-async def create_restart_policy(request: RestartPolicyCreateRequest):
+async def create_restart_policy(
+    request: RestartPolicyCreateRequest,
+    config_manager: ConfigManager = Depends(get_config_manager),
+):
     """Create a new restart policy."""
     try:
         # Create policy in database
@@ -171,8 +175,6 @@ async def create_restart_policy(request: RestartPolicyCreateRequest):
             )
         
         # Add to config
-        from src.api.deps import get_config_manager
-        config_manager = get_config_manager()
         policy_config = RestartPolicyConfig(
             process_name=request.process_name,
             max_retries=request.max_retries,
@@ -197,7 +199,11 @@ async def create_restart_policy(request: RestartPolicyCreateRequest):
 
 
 @router.put("/{process_name}", response_model=MessageResponse)
-async def update_restart_policy(process_name: str, request: RestartPolicyCreateRequest):
+async def update_restart_policy(
+    process_name: str,
+    request: RestartPolicyCreateRequest,
+    config_manager: ConfigManager = Depends(get_config_manager),
+):
     """Update an existing restart policy."""
     try:
         success = update_policy(process_name, request)
@@ -205,8 +211,6 @@ async def update_restart_policy(process_name: str, request: RestartPolicyCreateR
             raise HTTPException(status_code=404, detail=f"Restart policy for '{process_name}' not found")
         
         # Update config
-        from src.api.deps import get_config_manager
-        config_manager = get_config_manager()
         config = config_manager.get_config()
         
         for i, policy in enumerate(config.restart_policies):
@@ -233,7 +237,10 @@ async def update_restart_policy(process_name: str, request: RestartPolicyCreateR
 
 
 @router.delete("/{process_name}", response_model=MessageResponse)
-async def delete_restart_policy(process_name: str):
+async def delete_restart_policy(
+    process_name: str,
+    config_manager: ConfigManager = Depends(get_config_manager),
+):
     """Delete a restart policy."""
     try:
         success = delete_policy(process_name)
@@ -241,8 +248,6 @@ async def delete_restart_policy(process_name: str):
             raise HTTPException(status_code=404, detail=f"Restart policy for '{process_name}' not found")
         
         # Remove from config
-        from src.api.deps import get_config_manager
-        config_manager = get_config_manager()
         config = config_manager.get_config()
         config.restart_policies = [
             p for p in config.restart_policies if p.process_name != process_name
@@ -1,23 +1,23 @@
 """Schedule management API endpoints."""
 
 from typing import List
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 import structlog
 
 from src.api.models.requests import ScheduleCreateRequest
 from src.api.models.responses import ScheduleResponse, MessageResponse
 from src.api.deps import get_scheduler, get_config_manager
-from src.config.config_manager import ScheduleConfig
+from src.config.config_manager import ConfigManager, ScheduleConfig
+from src.core.scheduler import ProcessScheduler as Scheduler
 
 router = APIRouter()
 logger = structlog.get_logger()
 
 
 @router.get("/", response_model=List[ScheduleResponse])
-async def list_schedules():
+async def list_schedules(scheduler: Scheduler = Depends(get_scheduler)):
     """Get all schedules."""
     try:
-        scheduler = get_scheduler()
         schedules = scheduler.get_all_schedules()
         return [
             ScheduleResponse(
@@ -39,9 +39,8 @@ async def list_schedules():
 
 
 @router.get("/{name}", response_model=ScheduleResponse)
-async def get_schedule(name: str):
+async def get_schedule(name: str, scheduler: Scheduler = Depends(get_scheduler)):
     """Get a specific schedule by name."""
-    scheduler = get_scheduler()
     schedule = scheduler.get_schedule(name)
     if not schedule:
         raise HTTPException(status_code=404, detail=f"Schedule '{name}' not found")
@@ -60,7 +59,11 @@ async def get_schedule(name: str):
 
 
 @router.post("/", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
-async def create_schedule(request: ScheduleCreateRequest):
+async def create_schedule(
+    request: ScheduleCreateRequest,
+    scheduler: Scheduler = Depends(get_scheduler),
+    config_manager: ConfigManager = Depends(get_config_manager),
+):
     """Create a new schedule."""
     try:
         # Create schedule config
@@ -74,7 +77,6 @@ async def create_schedule(request: ScheduleCreateRequest):
         )
         
         # Add to scheduler
-        scheduler = get_scheduler()
         if config.schedule_type == "cron":
             scheduler.add_cron_schedule(
                 name=config.name,
@@ -89,7 +91,6 @@ async def create_schedule(request: ScheduleCreateRequest):
             )
         
         # Save to config
-        config_manager = get_config_manager()
         config_manager.add_schedule(config)
         config_manager.save_config()
         
@@ -104,16 +105,18 @@ async def create_schedule(request: ScheduleCreateRequest):
 
 
 @router.post("/{name}/enable", response_model=MessageResponse)
-async def enable_schedule(name: str):
+async def enable_schedule(
+    name: str,
+    scheduler: Scheduler = Depends(get_scheduler),
+    config_manager: ConfigManager = Depends(get_config_manager),
+):
     """Enable a schedule."""
     try:
-        scheduler = get_scheduler()
         success = scheduler.enable_schedule(name)
         if not success:
             raise HTTPException(status_code=404, detail=f"Schedule '{name}' not found")
         
         # Update config
-        config_manager = get_config_manager()
         config = config_manager.get_config()
         for schedule in config.schedules:
             if schedule.name == name:
@@ -130,16 +133,18 @@ async def enable_schedule(name: str):
 
 
 @router.post("/{name}/disable", response_model=MessageResponse)
-async def disable_schedule(name: str):
+async def disable_schedule(
+    name: str,
+    scheduler: Scheduler = Depends(get_scheduler),
+    config_manager: ConfigManager = Depends(get_config_manager),
+):
     """Disable a schedule."""
     try:
-        scheduler = get_scheduler()
         success = scheduler.disable_schedule(name)
         if not success:
             raise HTTPException(status_code=404, detail=f"Schedule '{name}' not found")
         
         # Update config
-        config_manager = get_config_manager()
         config = config_manager.get_config()
         for schedule in config.schedules:
             if schedule.name == name:
@@ -156,16 +161,18 @@ async def disable_schedule(name: str):
 
 
 @router.delete("/{name}", response_model=MessageResponse)
-async def delete_schedule(name: str):
+async def delete_schedule(
+    name: str,
+    scheduler: Scheduler = Depends(get_scheduler),
+    config_manager: ConfigManager = Depends(get_config_manager),
+):
     """Delete a schedule."""
     try:
-        scheduler = get_scheduler()
         success = scheduler.remove_schedule(name)
         if not success:
             raise HTTPException(status_code=404, detail=f"Schedule '{name}' not found")
         
         # Remove from config
-        config_manager = get_config_manager()
         config_manager.remove_schedule(name)
         config_manager.save_config()
         
@@ -3,15 +3,19 @@
 import time
 from typing import List
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 import psutil
 import structlog
+from sqlalchemy import text
 
 from src.api.models.responses import (
     SystemStatusResponse,
     HealthResponse,
     LogEntry
 )
+from src.api.deps import get_process_manager, get_scheduler
+from src.core.process_manager import ProcessManager
+from src.core.scheduler import ProcessScheduler as Scheduler
 
 router = APIRouter()
 logger = structlog.get_logger()
@@ -24,7 +28,7 @@ SERVICE_START_TIME = time.time()
 async def health_check():
     """Health check endpoint."""
     try:
-        from src.api.deps import get_process_manager, get_scheduler
+        # Looked up directly so an uninitialised manager reports unhealthy
         process_manager = get_process_manager()
         scheduler = get_scheduler()
         
@@ -34,7 +38,7 @@ async def health_check():
             # Simple database check
             from src.models.base import SessionLocal
             db = SessionLocal()
-            db.execute("SELECT 1")
+            db.execute(text("SELECT 1"))
             db.close()
         except Exception:
             db_status = "error"
@@ -59,14 +63,12 @@ async def health_check():
 
 
 @router.get("/status", response_model=SystemStatusResponse)
-async def system_status():
+async def system_status(
+    process_manager: ProcessManager = Depends(get_process_manager),
+    scheduler: Scheduler = Depends(get_scheduler),
+):
     """Get system status information."""
     try:
-        from src.api.deps import get_process_manager, get_scheduler
-        
-        process_manager = get_process_manager()
-        scheduler = get_scheduler()
-        
         # Get process stats
         all_processes = process_manager.get_all_processes()
         running_processes = [p for p in all_processes if p.status == "running"]
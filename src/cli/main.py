@@ -42,10 +42,23 @@ policy_manager = RestartPolicyManager()
 # Connect scheduler to process manager
 scheduler.set_process_manager(process_manager)
 
+# Let the process manager apply restart policies when processes exit
+process_manager.set_restart_policy_manager(policy_manager)
+
 # Initialize database
 init_db()
 
 
+def _parse_delay(ctx, param, value):
+    """Click callback converting a delay option such as "30m" to seconds."""
+    if value is None:
+        return None
+    try:
+        return parse_time_to_seconds(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from None
+
+
 @click.group()
 @click.option('--log-level', default='info', type=click.Choice(['debug', 'info', 'warn', 'error']))
 @click.option('--no-color', is_flag=True, help='Disable colored output')
@@ -64,7 +77,7 @@ def cli(log_level, no_color):
 @click.option('--env', '-e', multiple=True, help='Environment variables (KEY=VALUE)')
 @click.option('--group', '-g', help='Process group name')
 @click.option('--restart-policy', default='standard', help='Restart policy name')
-@click.option('--restart-delay', help='Custom restart delay (e.g., 5h, 30m, 45s)')
+@click.option('--restart-delay', callback=_parse_delay, help='Custom restart delay (e.g., 5h, 30m, 45s)')
 @click.option('--schedule', help='Schedule expression (cron or interval)')
 @click.option('--detach', is_flag=True, help='Run in background')
 def start(name, cmd, args, working_dir, env, group, restart_policy, restart_delay, schedule, detach):
@@ -101,8 +114,8 @@ def start(name, cmd, args, working_dir, env, group, restart_policy, restart_dela
         )
         
         # Handle custom restart delay if provided
-        if restart_delay:
-            delay_seconds = parse_time_to_seconds(restart_delay)
+        if restart_delay is not None:
+            delay_seconds = restart_delay
             # Create a custom policy with the specified delay
             custom_policy_name = f"{name}-custom-delay"
             try:
@@ -218,14 +231,11 @@ def stop(name, force, timeout, stop_all):
 @cli.command()
 @click.argument('name')
 @click.option('--force', '-f', is_flag=True, help='Force restart')
-@click.option('--delay', '-d', help='Delay between stop and start (e.g., 30s, 5m, 1h)')
+@click.option('--delay', '-d', callback=_parse_delay, help='Delay between stop and start (e.g., 30s, 5m, 1h)')
 def restart(name, force, delay):
     """Restart a process."""
     try:
-        # Parse delay if provided
-        delay_seconds = 0
-        if delay:
-            delay_seconds = parse_time_to_seconds(delay)
+        delay_seconds = delay or 0
         
         # If delay is specified, we need to stop first, wait, then start
         if delay_seconds > 0:
@@ -339,9 +349,9 @@ def status(name, watch, metrics, history):
                         memory = f"{metrics_data['memory_mb']} MB"
                 
                 uptime = "-"
-                if proc.started_at:
-                    from datetime import datetime
-                    delta = datetime.now() - proc.started_at
+                if proc.uptime is not None:
+                    from datetime import timedelta
+                    delta = timedelta(seconds=proc.uptime)
                     hours = delta.seconds // 3600
                     minutes = (delta.seconds % 3600) // 60
                     if delta.days > 0:
@@ -433,29 +443,24 @@ def list(filter_by, sort, limit):
 def logs(name, follow, tail, since, level, grep):
     """View process logs."""
     try:
-        output = process_manager.get_process_output(name)
+        stdout = process_manager.get_process_output_tail(name, "stdout", tail or None)
+        stderr = process_manager.get_process_output_tail(name, "stderr", tail or None)
         
-        if not output:
+        if not stdout and not stderr:
             console.print(f"[yellow]No logs available for process '{name}'[/yellow]")
             return
         
         # Display stdout
-        if output.get('stdout'):
+        if stdout:
             console.print("[bold cyan]STDOUT:[/bold cyan]")
-            lines = output['stdout'].splitlines()
-            if tail:
-                lines = lines[-tail:]
-            for line in lines:
+            for line in stdout:
                 if not grep or grep in line:
                     console.print(line)
         
         # Display stderr
-        if output.get('stderr'):
+        if stderr:
             console.print("\n[bold red]STDERR:[/bold red]")
-            lines = output['stderr'].splitlines()
-            if tail:
-                lines = lines[-tail:]
-            for line in lines:
+            for line in stderr:
                 if not grep or grep in line:
                     console.print(line)
         
@@ -472,21 +477,20 @@ def restart_policy():
 
 @restart_policy.command('create')
 @click.option('--name', required=True, help='Policy name')
-@click.option('--delay', help='Restart delay (e.g., 5h, 30m, 45s)')
+@click.option('--delay', callback=_parse_delay, help='Restart delay (e.g., 5h, 30m, 45s)')
 @click.option('--max-retries', type=int, default=3, help='Maximum retry attempts')
 @click.option('--backoff', type=float, default=1.5, help='Backoff multiplier')
-@click.option('--max-delay', help='Maximum delay (e.g., 1h)')
+@click.option('--max-delay', callback=_parse_delay, help='Maximum delay (e.g., 1h)')
 def create_policy(name, delay, max_retries, backoff, max_delay):
     """Create a new restart policy."""
     try:
-        # Parse delays if provided
         retry_delay = 5  # Default 5 seconds
-        if delay:
-            retry_delay = int(parse_time_to_seconds(delay))
+        if delay is not None:
+            retry_delay = int(delay)
         
         max_delay_seconds = 300  # Default 5 minutes
-        if max_delay:
-            max_delay_seconds = int(parse_time_to_seconds(max_delay))
+        if max_delay is not None:
+            max_delay_seconds = int(max_delay)
         
         policy = policy_manager.create_policy(
             name=name,
@@ -538,23 +542,23 @@ def list_policies():
 
 @restart_policy.command('update')
 @click.argument('name')
-@click.option('--delay', help='New restart delay (e.g., 5h, 30m, 45s)')
+@click.option('--delay', callback=_parse_delay, help='New restart delay (e.g., 5h, 30m, 45s)')
 @click.option('--max-retries', type=int, help='New maximum retry attempts')
 @click.option('--backoff', type=float, help='New backoff multiplier')
-@click.option('--max-delay', help='New maximum delay (e.g., 1h)')
+@click.option('--max-delay', callback=_parse_delay, help='New maximum delay (e.g., 1h)')
 def update_policy(name, delay, max_retries, backoff, max_delay):
     """Update an existing restart policy."""
     try:
         kwargs = {}
         
-        if delay:
-            kwargs['retry_delay'] = int(parse_time_to_seconds(delay))
+        if delay is not None:
+            kwargs['retry_delay'] = int(delay)
         if max_retries is not None:
             kwargs['max_retries'] = max_retries
         if backoff is not None:
             kwargs['backoff_multiplier'] = backoff
-        if max_delay:
-            kwargs['max_delay'] = int(parse_time_to_seconds(max_delay))
+        if max_delay is not None:
+            kwargs['max_delay'] = int(max_delay)
         
         if not kwargs:
             console.print("[yellow]No updates specified[/yellow]")
@@ -1,6 +1,8 @@
 """Process management module for SentinelZero."""
 
+import fcntl
 import os
+import queue
 import signal
 import subprocess
 import threading
@@ -9,12 +11,28 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import psutil
 import structlog
 
+from .restart_policy import RestartDecision
+
 logger = structlog.get_logger()
 
+# os.waitid is not available on every platform (notably macOS)
+_HAS_WAITID = hasattr(os, "waitid")
+
+# Output capture reads in large chunks; on Linux the pipe is also enlarged
+_READ_CHUNK_SIZE = 65536
+_PIPE_SIZE = 1 << 20
+_F_SETPIPE_SZ = getattr(fcntl, "F_SETPIPE_SZ", None)
+
+# Captured output is capped per stream; the oldest bytes are dropped first
+_MAX_OUTPUT_BYTES = 1 << 20
+
+# Maximum number of exit events handled per wakeup of the consumer thread
+_EXIT_EVENT_BATCH = 64
+
 
 class ProcessStatus(Enum):
     """Process status enumeration."""
@@ -25,7 +43,7 @@ class ProcessStatus(Enum):
     STOPPING = "stopping"
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcessInfo:
     """Information about a managed process."""
     name: str
@@ -41,6 +59,18 @@ class ProcessInfo:
     stopped_at: Optional[datetime] = None
     group: Optional[str] = None
     restart_count: int = 0
+    last_cpu_percent: Optional[float] = None
+    # Monotonic timestamps (time.monotonic_ns) used for duration math
+    started_ns: Optional[int] = None
+    stopped_ns: Optional[int] = None
+    
+    @property
+    def uptime(self) -> Optional[float]:
+        """Seconds the process has been running, or ran for if it has stopped."""
+        if self.started_ns is None:
+            return None
+        end_ns = self.stopped_ns if self.stopped_ns is not None else time.monotonic_ns()
+        return (end_ns - self.started_ns) / 1e9
 
 
 class ProcessManager:
@@ -50,23 +80,63 @@ class ProcessManager:
         """Initialize the process manager."""
         self._processes: Dict[str, ProcessInfo] = {}
         self._subprocesses: Dict[str, subprocess.Popen] = {}
-        self._output_buffers: Dict[str, Dict[str, str]] = {}
+        self._pid_to_name: Dict[int, str] = {}
+        # Immutable view of _subprocesses, rebuilt under the lock on every change
+        # so the monitor can scan it without locking
+        self._subprocess_snapshot: Tuple[Tuple[str, subprocess.Popen], ...] = ()
+        self._groups: Dict[str, Dict[str, None]] = {}  # group -> names, in insertion order
+        self._base_env: Dict[str, str] = dict(os.environ)
+        self._psutil_procs: Dict[str, psutil.Process] = {}
+        self._output_buffers: Dict[str, Dict[str, bytearray]] = {}
         self._lock = threading.RLock()
-        self._running = True
+        self._shutdown_evt = threading.Event()
+        self._restart_policy_manager = None
+        # Pending policy restarts, and processes the user stopped so that a
+        # restart already in flight does not bring them back
+        self._restart_timers: Dict[str, threading.Timer] = {}
+        self._user_stopped: set = set()
+        self._exit_events: queue.SimpleQueue = queue.SimpleQueue()
         self._monitor_thread = threading.Thread(target=self._monitor_processes, daemon=True)
         self._monitor_thread.start()
+        self._exit_thread = threading.Thread(target=self._consume_exit_events, daemon=True)
+        self._exit_thread.start()
         
         logger.info("ProcessManager initialized")
     
     def __del__(self):
         """Cleanup on deletion."""
-        self._running = False
+        try:
+            self.close()
+        except Exception:
+            pass
+    
+    def close(self, timeout: int = 5) -> None:
+        """Stop all processes and shut down the background threads."""
+        if self._shutdown_evt.is_set():
+            return
+        
+        # Signal shutdown first so background threads exit promptly
+        self._shutdown_evt.set()
+        self._exit_events.put(None)
+        
+        with self._lock:
+            for timer in self._restart_timers.values():
+                timer.cancel()
+            self._restart_timers.clear()
+        
         # Stop all processes gracefully
         for name in list(self._processes.keys()):
             try:
-                self.stop_process(name, timeout=5)
-            except:
+                self.stop_process(name, timeout=timeout)
+            except Exception:
                 pass
+        
+        if threading.current_thread() is not self._monitor_thread:
+            self._monitor_thread.join(timeout)
+    
+    def set_restart_policy_manager(self, restart_policy_manager) -> None:
+        """Set the restart policy manager consulted when a process exits."""
+        self._restart_policy_manager = restart_policy_manager
     
     def start_process(
         self,
@@ -94,52 +164,70 @@ class ProcessManager:
                 group=group
             )
             
-            # Prepare environment
-            env = os.environ.copy()
-            if env_vars:
-                env.update(env_vars)
-            
-            # Prepare command
-            cmd = [command] + (args or [])
-            
-            # Set up output capture
-            stdout_param = subprocess.PIPE if capture_output else None
-            stderr_param = subprocess.PIPE if capture_output else None
+            self._spawn(process_info, capture_output)
+            self._processes[name] = process_info
+            if group:
+                self._groups.setdefault(group, {})[name] = None
             
-            try:
-                # Start the subprocess
-                proc = subprocess.Popen(
-                    cmd,
-                    stdout=stdout_param,
-                    stderr=stderr_param,
-                    cwd=working_dir,
-                    env=env,
-                    start_new_session=True  # Create new process group
-                )
-                
-                # Update process info
-                process_info.pid = proc.pid
-                process_info.status = ProcessStatus.RUNNING
-                process_info.started_at = datetime.now()
-                
-                # Store references
-                self._processes[name] = process_info
-                self._subprocesses[name] = proc
-                
-                # Initialize output buffers
-                if capture_output:
-                    self._output_buffers[name] = {"stdout": "", "stderr": ""}
-                    # Start output capture threads
-                    self._start_output_capture(name, proc)
-                
-                logger.info(f"Started process '{name}' with PID {proc.pid}")
-                
-                return process_info
-                
-            except Exception as e:
-                process_info.status = ProcessStatus.FAILED
-                logger.error(f"Failed to start process '{name}': {e}")
-                raise
+            return process_info
+    
+    def _spawn(self, process_info: ProcessInfo, capture_output: bool) -> None:
+        """Launch the subprocess for a process entry and register it.
+        
+        Must be called with the lock held. The entry is updated in place so
+        restarts reuse it instead of replacing it.
+        """
+        name = process_info.name
+        self._user_stopped.discard(name)
+        
+        # Prepare environment; without overrides the child simply inherits ours
+        env = {**self._base_env, **process_info.env_vars} if process_info.env_vars else None
+        
+        # Prepare command
+        cmd = [process_info.command] + process_info.args
+        
+        # Set up output capture
+        stdout_param = subprocess.PIPE if capture_output else None
+        stderr_param = subprocess.PIPE if capture_output else None
+        
+        try:
+            # Start the subprocess
+            proc = subprocess.Popen(
+                cmd,
+                stdout=stdout_param,
+                stderr=stderr_param,
+                cwd=process_info.working_dir,
+                env=env,
+                start_new_session=True  # Create new process group
+            )
+        except Exception as e:
+            process_info.status = ProcessStatus.FAILED
+            logger.error(f"Failed to start process '{name}': {e}")
+            raise
+        
+        # Update process info
+        process_info.pid = proc.pid
+        process_info.status = ProcessStatus.RUNNING
+        process_info.exit_code = None
+        process_info.started_at = datetime.now()
+        process_info.started_ns = time.monotonic_ns()
+        process_info.stopped_at = None
+        process_info.stopped_ns = None
+        process_info.last_cpu_percent = None
+        
+        # Store references
+        self._subprocesses[name] = proc
+        self._refresh_snapshot()
+        self._pid_to_name[proc.pid] = name
+        self._track_psutil_process(name, proc.pid)
+        
+        # Initialize output buffers
+        if capture_output:
+            self._output_buffers[name] = {"stdout": bytearray(), "stderr": bytearray()}
+            # Start output capture threads
+            self._start_output_capture(name, proc)
+        
+        logger.info(f"Started process '{name}' with PID {proc.pid}")
     
     def stop_process(
         self,
@@ -152,6 +240,9 @@ class ProcessManager:
             if name not in self._processes:
                 raise ValueError(f"Process '{name}' not found")
             
+            self._cancel_restart(name)
+            self._user_stopped.add(name)
+            
             process_info = self._processes[name]
             
             if process_info.status == ProcessStatus.STOPPED:
@@ -169,6 +260,8 @@ class ProcessManager:
                 if force:
                     # Force kill with SIGKILL
                     proc.kill()
+                    # Reap the child so it doesn't linger as a zombie
+                    proc.wait()
                     logger.info(f"Force killed process '{name}'")
                 else:
                     # Graceful termination with SIGTERM
@@ -179,15 +272,20 @@ class ProcessManager:
                     except subprocess.TimeoutExpired:
                         # Force kill if timeout exceeded
                         proc.kill()
+                        proc.wait()
                         logger.warning(f"Process '{name}' didn't stop gracefully, force killed")
                 
                 # Update process info
                 process_info.status = ProcessStatus.STOPPED
                 process_info.stopped_at = datetime.now()
+                process_info.stopped_ns = time.monotonic_ns()
                 process_info.exit_code = proc.returncode
                 
                 # Clean up subprocess reference
                 del self._subprocesses[name]
+                self._refresh_snapshot()
+                self._pid_to_name.pop(proc.pid, None)
+                self._psutil_procs.pop(name, None)
                 
                 return True
                 
@@ -197,43 +295,23 @@ class ProcessManager:
     
     def restart_process(self, name: str) -> ProcessInfo:
         """Restart a process."""
-        if name not in self._processes:
-            raise ValueError(f"Process '{name}' not found")
-        
-        # Get process configuration
-        process_info = self._processes[name]
-        command = process_info.command
-        args = process_info.args
-        working_dir = process_info.working_dir
-        env_vars = process_info.env_vars
-        capture_output = name in self._output_buffers
-        group = process_info.group
-        
-        # Increment restart count
-        restart_count = process_info.restart_count + 1
-        
-        # Stop if running
-        if process_info.status == ProcessStatus.RUNNING:
-            self.stop_process(name)
-        
-        # Remove old process info
-        del self._processes[name]
-        
-        # Start with same configuration
-        new_info = self.start_process(
-            name=name,
-            command=command,
-            args=args,
-            working_dir=working_dir,
-            env_vars=env_vars,
-            capture_output=capture_output,
-            group=group
-        )
-        
-        # Restore restart count
-        new_info.restart_count = restart_count
-        
-        return new_info
+        with self._lock:
+            process_info = self._processes.get(name)
+            if process_info is None:
+                raise ValueError(f"Process '{name}' not found")
+            
+            capture_output = name in self._output_buffers
+            self._cancel_restart(name)
+            
+            # Stop if running
+            if process_info.status == ProcessStatus.RUNNING:
+                self.stop_process(name)
+            
+            # Relaunch into the same entry, keeping its configuration
+            process_info.restart_count += 1
+            self._spawn(process_info, capture_output)
+            
+            return process_info
     
     def get_status(self, name: str) -> ProcessStatus:
         """Get the status of a process."""
@@ -250,15 +328,53 @@ class ProcessManager:
     def list_processes(self, group: Optional[str] = None) -> List[ProcessInfo]:
         """List all processes, optionally filtered by group."""
         with self._lock:
-            processes = list(self._processes.values())
             if group:
-                processes = [p for p in processes if p.group == group]
-            return processes
+                return [self._processes[n] for n in self._groups.get(group, ())]
+            return list(self._processes.values())
     
     def get_process_output(self, name: str) -> Optional[Dict[str, str]]:
         """Get captured output from a process."""
         with self._lock:
-            return self._output_buffers.get(name)
+            buffers = self._output_buffers.get(name)
+            if buffers is None:
+                return None
+            # Output is kept as raw bytes and decoded once per read
+            return {
+                stream: buf.decode('utf-8', errors='replace')
+                for stream, buf in buffers.items()
+            }
+    
+    def get_process_output_tail(
+        self,
+        name: str,
+        stream: str = "stdout",
+        lines: Optional[int] = None
+    ) -> Optional[List[str]]:
+        """Get the last ``lines`` lines of one captured stream, or all if None.
+        
+        Only the requested tail is decoded. Once a stream has exceeded the
+        capture limit its oldest retained line may be partial.
+        """
+        with self._lock:
+            buffers = self._output_buffers.get(name)
+            if buffers is None:
+                return None
+            data = bytes(buffers[stream])
+        
+        end = len(data)
+        if data.endswith(b"\n"):
+            end -= 1
+        start = 0
+        if lines is not None:
+            if lines <= 0:
+                return []
+            pos = end
+            for _ in range(lines):
+                pos = data.rfind(b"\n", 0, pos)
+                if pos == -1:
+                    break
+            start = pos + 1
+        return data[start:end].decode('utf-8', errors='replace').splitlines()
     
     def get_process_metrics(self, name: str) -> Optional[Dict[str, Any]]:
         """Get resource metrics for a running process."""
@@ -271,11 +387,18 @@ class ProcessManager:
             if process_info.status != ProcessStatus.RUNNING or not process_info.pid:
                 return None
             
-            try:
-                proc = psutil.Process(process_info.pid)
-                
+            cpu_percent = process_info.last_cpu_percent
+        
+        proc = self._psutil_procs.get(name)
+        if proc is None:
+            return None
+        
+        # psutil calls happen outside the lock and never block on a sampling interval
+        try:
+            with proc.oneshot():
                 # Get CPU and memory usage
-                cpu_percent = proc.cpu_percent(interval=0.1)
+                if cpu_percent is None:
+                    cpu_percent = proc.cpu_percent(interval=None)
                 memory_info = proc.memory_info()
                 memory_mb = memory_info.rss / (1024 * 1024)
                 
@@ -286,19 +409,43 @@ class ProcessManager:
                     "status": proc.status(),
                     "create_time": proc.create_time()
                 }
-                
+            
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+    
+    def _track_psutil_process(self, name: str, pid: int) -> None:
+        """Cache a psutil handle for a process and prime its CPU counter."""
+        try:
+            proc = psutil.Process(pid)
+            proc.cpu_percent(interval=None)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            self._psutil_procs.pop(name, None)
+            return
+        self._psutil_procs[name] = proc
+    
+    def _refresh_snapshot(self) -> None:
+        """Rebuild the subprocess snapshot; caller holds the lock."""
+        self._subprocess_snapshot = tuple(self._subprocesses.items())
+    
+    def _sample_cpu(self) -> None:
+        """Refresh the cached CPU usage of all running processes."""
+        processes = self._processes
+        psutil_procs = self._psutil_procs
+        
+        for name, _ in self._subprocess_snapshot:
+            proc = psutil_procs.get(name)
+            if proc is None:
+                continue
+            process_info = processes[name]
+            try:
+                process_info.last_cpu_percent = proc.cpu_percent(interval=None)
             except (psutil.NoSuchProcess, psutil.AccessDenied):
-                return None
+                pass
     
     def stop_group(self, group: str) -> None:
         """Stop all processes in a group."""
         with self._lock:
-            group_processes = [
-                name for name, info in self._processes.items()
-                if info.group == group
-            ]
-            
-            for name in group_processes:
+            for name in list(self._groups.get(group, ())):
                 try:
                     self.stop_process(name)
                 except Exception as e:
@@ -306,51 +453,199 @@ class ProcessManager:
     
     def _start_output_capture(self, name: str, proc: subprocess.Popen) -> None:
         """Start threads to capture process output."""
-        def capture_stdout():
-            if proc.stdout:
-                for line in iter(proc.stdout.readline, b''):
-                    if not self._running:
-                        break
-                    decoded = line.decode('utf-8', errors='replace')
-                    with self._lock:
-                        if name in self._output_buffers:
-                            self._output_buffers[name]["stdout"] += decoded
+        buffers = self._output_buffers[name]
         
-        def capture_stderr():
-            if proc.stderr:
-                for line in iter(proc.stderr.readline, b''):
-                    if not self._running:
+        def drain(pipe, stream: str):
+            # Read whatever is available instead of waiting for full lines so
+            # the child never blocks on a full pipe buffer
+            fd = pipe.fileno()
+            if _F_SETPIPE_SZ is not None:
+                try:
+                    fcntl.fcntl(fd, _F_SETPIPE_SZ, _PIPE_SIZE)
+                except OSError:
+                    pass
+            
+            buf = buffers[stream]
+            try:
+                while not self._shutdown_evt.is_set():
+                    chunk = os.read(fd, _READ_CHUNK_SIZE)
+                    if not chunk:
                         break
-                    decoded = line.decode('utf-8', errors='replace')
-                    with self._lock:
-                        if name in self._output_buffers:
-                            self._output_buffers[name]["stderr"] += decoded
+                    # Single writer per stream, so no lock is needed here
+                    buf += chunk
+                    if len(buf) > _MAX_OUTPUT_BYTES:
+                        del buf[:len(buf) - _MAX_OUTPUT_BYTES]
+            except OSError:
+                pass
+            finally:
+                pipe.close()
         
         # Start capture threads
-        threading.Thread(target=capture_stdout, daemon=True).start()
-        threading.Thread(target=capture_stderr, daemon=True).start()
+        if proc.stdout:
+            threading.Thread(target=drain, args=(proc.stdout, "stdout"), daemon=True).start()
+        if proc.stderr:
+            threading.Thread(target=drain, args=(proc.stderr, "stderr"), daemon=True).start()
+    
+    def _any_exited(self) -> bool:
+        """Check without locking whether a child may have exited."""
+        if _HAS_WAITID:
+            try:
+                return os.waitid(os.P_ALL, 0, os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None
+            except ChildProcessError:
+                return False
+        return any(proc.poll() is not None for _, proc in self._subprocess_snapshot)
+    
+    def _collect_exited(self) -> List[Tuple[str, subprocess.Popen]]:
+        """Collect managed subprocesses that have terminated.
+        
+        Peeks at exited children with a single ``os.waitid(WNOWAIT)`` call so
+        that a tick without exits costs one syscall rather than one ``poll()``
+        per process. Exited children are then reaped through ``Popen.poll()``
+        to keep ``returncode`` consistent. Falls back to polling every process
+        when ``waitid`` is unavailable or an unmanaged child is pending.
+        """
+        exited = []
+        
+        if _HAS_WAITID:
+            while True:
+                try:
+                    info = os.waitid(os.P_ALL, 0, os.WEXITED | os.WNOHANG | os.WNOWAIT)
+                except ChildProcessError:
+                    return exited
+                
+                if info is None:
+                    return exited
+                
+                name = self._pid_to_name.pop(info.si_pid, None)
+                if name is None:
+                    # Not one of ours; it will keep being reported, so poll instead
+                    break
+                
+                proc = self._subprocesses[name]
+                proc.poll()
+                exited.append((name, proc))
+        
+        for name, proc in self._subprocesses.items():
+            if proc.poll() is not None and (name, proc) not in exited:
+                self._pid_to_name.pop(proc.pid, None)
+                exited.append((name, proc))
+        
+        return exited
     
     def _monitor_processes(self) -> None:
         """Monitor running processes for crashes and status changes."""
-        while self._running:
-            with self._lock:
-                for name, proc in list(self._subprocesses.items()):
-                    poll_result = proc.poll()
+        # Bind everything the loop touches to locals; this runs for the manager's lifetime
+        lock = self._lock
+        processes = self._processes
+        subprocesses = self._subprocesses
+        psutil_procs = self._psutil_procs
+        any_exited = self._any_exited
+        collect_exited = self._collect_exited
+        refresh_snapshot = self._refresh_snapshot
+        sample_cpu = self._sample_cpu
+        put_event = self._exit_events.put
+        now = datetime.now
+        monotonic_ns = time.monotonic_ns
+        stopped, failed = ProcessStatus.STOPPED, ProcessStatus.FAILED
+        wait = self._shutdown_evt.wait
+        
+        while not wait(0.5):  # Check every 500ms until shutdown
+            # Only take the lock when something has actually exited
+            if not any_exited():
+                sample_cpu()
+                continue
+            
+            with lock:
+                exited = collect_exited()
+                for name, proc in exited:
+                    exit_code = proc.returncode
                     
-                    if poll_result is not None:
-                        # Process has terminated
-                        process_info = self._processes[name]
-                        process_info.exit_code = poll_result
-                        process_info.stopped_at = datetime.now()
-                        
-                        if poll_result == 0:
-                            process_info.status = ProcessStatus.STOPPED
-                            logger.info(f"Process '{name}' exited normally")
-                        else:
-                            process_info.status = ProcessStatus.FAILED
-                            logger.warning(f"Process '{name}' failed with exit code {poll_result}")
-                        
-                        # Remove from subprocesses
-                        del self._subprocesses[name]
+                    # Process has terminated
+                    process_info = processes[name]
+                    process_info.exit_code = exit_code
+                    process_info.stopped_at = now()
+                    process_info.stopped_ns = monotonic_ns()
+                    process_info.status = stopped if exit_code == 0 else failed
+                    
+                    # Remove from subprocesses
+                    del subprocesses[name]
+                    psutil_procs.pop(name, None)
+                    
+                    # Logging and restart decisions happen on the consumer thread
+                    put_event((name, exit_code, exit_code != 0))
+                
+                if exited:
+                    refresh_snapshot()
             
-            time.sleep(0.5)  # Check every 500ms
\ No newline at end of file
+            sample_cpu()
+    
+    def _consume_exit_events(self) -> None:
+        """Handle process exit events queued by the monitor in batches."""
+        while True:
+            batch = [self._exit_events.get()]
+            while len(batch) < _EXIT_EVENT_BATCH:
+                try:
+                    batch.append(self._exit_events.get_nowait())
+                except queue.Empty:
+                    break
+            
+            for event in batch:
+                if event is None:
+                    # Shutdown sentinel queued by close()
+                    return
+                name, exit_code, crashed = event
+                try:
+                    self._handle_exit(name, exit_code, crashed)
+                except Exception as e:
+                    logger.error(f"Error handling exit of process '{name}': {e}")
+    
+    def _handle_exit(self, name: str, exit_code: int, crashed: bool) -> None:
+        """Log a process exit and schedule a restart if its policy asks for one."""
+        if crashed:
+            logger.warning(f"Process '{name}' failed with exit code {exit_code}")
+        else:
+            logger.info(f"Process '{name}' exited normally")
+        
+        if self._restart_policy_manager is None:
+            return
+        
+        decision, delay = self._restart_policy_manager.should_restart(name, exit_code, crashed=crashed)
+        if decision != RestartDecision.RESTART:
+            return
+        
+        with self._lock:
+            if self._shutdown_evt.is_set() or name in self._user_stopped:
+                return
+            self._cancel_restart(name)
+            timer = threading.Timer(delay, self._restart_exited, args=(name,))
+            timer.daemon = True
+            self._restart_timers[name] = timer
+            timer.start()
+    
+    def _cancel_restart(self, name: str) -> None:
+        """Cancel a pending policy restart; caller holds the lock."""
+        timer = self._restart_timers.pop(name, None)
+        if timer is not None:
+            timer.cancel()
+    
+    def _restart_exited(self, name: str) -> None:
+        """Restart a process after its restart delay, unless it was handled meanwhile."""
+        with self._lock:
+            # A timer that fired just as it was cancelled is no longer registered
+            if self._restart_timers.get(name) is not threading.current_thread():
+                return
+            del self._restart_timers[name]
+            
+            process_info = self._processes.get(name)
+            if (
+                self._shutdown_evt.is_set()
+                or name in self._user_stopped
+                or process_info is None
+                or process_info.status not in (ProcessStatus.STOPPED, ProcessStatus.FAILED)
+            ):
+                return
+            
+            try:
+                self.restart_process(name)
+            except Exception as e:
+                logger.error(f"Failed to restart process '{name}': {e}")
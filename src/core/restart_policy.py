@@ -1,10 +1,12 @@
 """Restart policy module for automatic process recovery."""
 
+import threading
 import time
-from dataclasses import dataclass, field
+from collections import ChainMap
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Dict, List, Optional, Set
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional
 import structlog
 
 logger = structlog.get_logger()
@@ -17,7 +19,27 @@ class RestartDecision(Enum):
     BACKOFF = "backoff"
 
 
-@dataclass
+def _allow_any_code(exit_code: int) -> bool:
+    """Exit code filter for policies without code restrictions."""
+    return True
+
+
+def _compile_code_filter(
+    restart_on_codes: Optional[Iterable[int]],
+    ignore_codes: Optional[Iterable[int]]
+) -> Callable[[int], bool]:
+    """Build a predicate telling whether an exit code may trigger a restart."""
+    if restart_on_codes and ignore_codes:
+        return (frozenset(restart_on_codes) - frozenset(ignore_codes)).__contains__
+    if restart_on_codes:
+        return frozenset(restart_on_codes).__contains__
+    if ignore_codes:
+        ignored = frozenset(ignore_codes)
+        return lambda exit_code: exit_code not in ignored
+    return _allow_any_code
+
+
+@dataclass(slots=True)
 class RestartPolicy:
     """Defines a restart policy for processes."""
     name: str
@@ -25,71 +47,107 @@ class RestartPolicy:
     retry_delay: int = 5  # seconds
     backoff_multiplier: float = 1.5
     max_delay: int = 300  # Maximum delay in seconds (5 minutes)
-    restart_on_codes: Optional[Set[int]] = None  # Specific exit codes to restart on
-    ignore_codes: Optional[Set[int]] = None  # Exit codes to not restart on
+    restart_on_codes: Optional[FrozenSet[int]] = None  # Specific exit codes to restart on
+    ignore_codes: Optional[FrozenSet[int]] = None  # Exit codes to not restart on
     health_check_command: Optional[str] = None
     health_check_interval: int = 30  # seconds
     created_at: datetime = field(default_factory=datetime.now)
+    _should_restart_code: Callable[[int], bool] = field(
+        default=_allow_any_code, init=False, repr=False, compare=False
+    )
+    
+    def __post_init__(self):
+        self.compile_code_filter()
+    
+    def compile_code_filter(self) -> None:
+        """Precompute the exit code predicate from restart_on_codes and ignore_codes."""
+        self._should_restart_code = _compile_code_filter(self.restart_on_codes, self.ignore_codes)
 
 
-@dataclass
+@dataclass(slots=True)
 class RestartState:
     """Tracks restart state for a process."""
     process_name: str
     policy_name: str
     restart_count: int = 0
-    last_restart: Optional[datetime] = None
+    last_restart_ns: Optional[int] = None  # time.monotonic_ns() of the last restart
     current_delay: int = 0
     consecutive_failures: int = 0
-
-
-class RestartPolicyManager:
-    """Manages restart policies and decisions."""
+    # Copied from the policy so restart decisions need no policy lookup
+    max_retries: int = 3
+    retry_delay: int = 5
+    backoff_multiplier: float = 1.5
+    max_delay: int = 300
+    restart_on_codes: Optional[FrozenSet[int]] = None
+    ignore_codes: Optional[FrozenSet[int]] = None
+    _should_restart_code: Callable[[int], bool] = field(
+        default=_allow_any_code, repr=False, compare=False
+    )
+    # Guards the counters so unrelated processes are not serialized
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
     
-    def __init__(self):
-        """Initialize the restart policy manager."""
-        self._policies: Dict[str, RestartPolicy] = {}
-        self._process_policies: Dict[str, str] = {}  # process_name -> policy_name
-        self._restart_states: Dict[str, RestartState] = {}
-        
-        # Create default policies
-        self._create_default_policies()
-        
-        logger.info("RestartPolicyManager initialized")
+    @property
+    def seconds_since_last_restart(self) -> Optional[float]:
+        """Seconds elapsed since the last restart, immune to wall-clock jumps."""
+        if self.last_restart_ns is None:
+            return None
+        return (time.monotonic_ns() - self.last_restart_ns) / 1e9
     
-    def _create_default_policies(self):
-        """Create default restart policies."""
-        # Standard policy
-        self.create_policy(
+    @property
+    def last_restart(self) -> Optional[datetime]:
+        """Wall-clock time of the last restart, computed on demand."""
+        elapsed = self.seconds_since_last_restart
+        if elapsed is None:
+            return None
+        return datetime.now() - timedelta(seconds=elapsed)
+
+
+# Built-in policies, shared read-only by every manager
+DEFAULT_POLICIES: Dict[str, RestartPolicy] = {
+    policy.name: policy
+    for policy in (
+        RestartPolicy(
             name="standard",
             max_retries=3,
             retry_delay=5,
             backoff_multiplier=1.5
-        )
-        
-        # Aggressive policy
-        self.create_policy(
+        ),
+        RestartPolicy(
             name="aggressive",
             max_retries=10,
             retry_delay=1,
             backoff_multiplier=2.0,
             max_delay=60
-        )
-        
-        # Conservative policy
-        self.create_policy(
+        ),
+        RestartPolicy(
             name="conservative",
             max_retries=5,
             retry_delay=30,
             backoff_multiplier=1.2,
             max_delay=600
-        )
-        
-        # No restart policy
-        self.create_policy(
+        ),
+        RestartPolicy(
             name="none",
             max_retries=0
-        )
+        ),
+    )
+}
+
+
+class RestartPolicyManager:
+    """Manages restart policies and decisions."""
+    
+    def __init__(self):
+        """Initialize the restart policy manager."""
+        # User policies shadow the shared defaults; writes only touch the first map
+        self._user_policies: Dict[str, RestartPolicy] = {}
+        self._policies: ChainMap = ChainMap(self._user_policies, DEFAULT_POLICIES)
+        self._process_policies: Dict[str, str] = {}  # process_name -> policy_name
+        self._restart_states: Dict[str, RestartState] = {}
+        # Guards the state dict only; per-state locks guard the counters
+        self._states_lock = threading.Lock()
+        
+        logger.info("RestartPolicyManager initialized")
     
     def create_policy(
         self,
@@ -113,8 +171,8 @@ class RestartPolicyManager:
             retry_delay=retry_delay,
             backoff_multiplier=backoff_multiplier,
             max_delay=max_delay,
-            restart_on_codes=set(restart_on_codes) if restart_on_codes else None,
-            ignore_codes=set(ignore_codes) if ignore_codes else None,
+            restart_on_codes=frozenset(restart_on_codes) if restart_on_codes else None,
+            ignore_codes=frozenset(ignore_codes) if ignore_codes else None,
             health_check_command=health_check_command,
             health_check_interval=health_check_interval
         )
@@ -129,20 +187,33 @@ class RestartPolicyManager:
         if name not in self._policies:
             raise ValueError(f"Policy '{name}' not found")
         
-        policy = self._policies[name]
+        policy = self._user_policies.get(name)
+        if policy is None:
+            # Copy-on-write so edits to a built-in never leak into other managers
+            policy = replace(DEFAULT_POLICIES[name])
+            self._user_policies[name] = policy
         
         for key, value in kwargs.items():
             if hasattr(policy, key):
                 if key in ['restart_on_codes', 'ignore_codes'] and value is not None:
-                    value = set(value)
+                    value = frozenset(value)
                 setattr(policy, key, value)
         
+        policy.compile_code_filter()
+        
+        # Refresh the copies held by processes using this policy
+        with self._states_lock:
+            states = [state for state in self._restart_states.values() if state.policy_name == name]
+        for state in states:
+            with state.lock:
+                self._sync_state(state, policy)
+        
         logger.info(f"Updated policy '{name}'")
         return policy
     
     def delete_policy(self, name: str) -> bool:
         """Delete a policy."""
-        if name in ["standard", "aggressive", "conservative", "none"]:
+        if name in DEFAULT_POLICIES:
             raise ValueError(f"Cannot delete built-in policy '{name}'")
         
         if name not in self._policies:
@@ -158,11 +229,18 @@ class RestartPolicyManager:
     
     def get_policy(self, name: str) -> Optional[RestartPolicy]:
         """Get a policy by name."""
-        return self._policies.get(name)
+        policy = self._policies.get(name)
+        if policy is not None and name not in self._user_policies:
+            # Built-ins are shared by every manager, so callers get a copy
+            policy = replace(policy)
+        return policy
     
     def list_policies(self) -> List[RestartPolicy]:
         """List all policies."""
-        return list(self._policies.values())
+        return [
+            policy if name in self._user_policies else replace(policy)
+            for name, policy in self._policies.items()
+        ]
     
     def apply_policy(self, process_name: str, policy_name: str) -> None:
         """Apply a policy to a process."""
@@ -172,13 +250,27 @@ class RestartPolicyManager:
         self._process_policies[process_name] = policy_name
         
         # Initialize restart state
-        self._restart_states[process_name] = RestartState(
+        state = RestartState(
             process_name=process_name,
             policy_name=policy_name
         )
+        self._sync_state(state, self._policies[policy_name])
+        with self._states_lock:
+            self._restart_states[process_name] = state
         
         logger.info(f"Applied policy '{policy_name}' to process '{process_name}'")
     
+    @staticmethod
+    def _sync_state(state: RestartState, policy: RestartPolicy) -> None:
+        """Copy the decision-relevant policy fields onto a restart state."""
+        state.max_retries = policy.max_retries
+        state.retry_delay = policy.retry_delay
+        state.backoff_multiplier = policy.backoff_multiplier
+        state.max_delay = policy.max_delay
+        state.restart_on_codes = policy.restart_on_codes
+        state.ignore_codes = policy.ignore_codes
+        state._should_restart_code = policy._should_restart_code
+    
     def should_restart(
         self,
         process_name: str,
@@ -190,50 +282,46 @@ class RestartPolicyManager:
         Returns:
             Tuple of (decision, delay_seconds)
         """
-        # Check if process has a policy
-        if process_name not in self._process_policies:
+        # Processes without an applied policy have no restart state
+        with self._states_lock:
+            state = self._restart_states.get(process_name)
+        if state is None:
             return (RestartDecision.STOP, 0)
         
-        policy_name = self._process_policies[process_name]
-        policy = self._policies[policy_name]
-        
-        # Get or create restart state
-        if process_name not in self._restart_states:
-            self._restart_states[process_name] = RestartState(
-                process_name=process_name,
-                policy_name=policy_name
-            )
-        
-        state = self._restart_states[process_name]
-        
-        # Check if we should ignore this exit code
-        if policy.ignore_codes and exit_code in policy.ignore_codes:
-            logger.info(f"Process '{process_name}' exit code {exit_code} is in ignore list")
-            return (RestartDecision.STOP, 0)
-        
-        # Check if we should only restart on specific codes
-        if policy.restart_on_codes and exit_code not in policy.restart_on_codes:
-            logger.info(f"Process '{process_name}' exit code {exit_code} not in restart list")
+        with state.lock:
+            return self._decide(state, process_name, exit_code, crashed)
+    
+    @staticmethod
+    def _decide(
+        state: RestartState,
+        process_name: str,
+        exit_code: int,
+        crashed: bool
+    ) -> tuple[RestartDecision, int]:
+        """Make a restart decision and update the state; caller holds state.lock."""
+        # Check the exit code against the policy's restart/ignore lists
+        if not state._should_restart_code(exit_code):
+            logger.info(f"Process '{process_name}' exit code {exit_code} does not trigger a restart")
             return (RestartDecision.STOP, 0)
         
         # Check max retries
-        if state.restart_count >= policy.max_retries:
-            logger.warning(f"Process '{process_name}' exceeded max retries ({policy.max_retries})")
+        if state.restart_count >= state.max_retries:
+            logger.warning(f"Process '{process_name}' exceeded max retries ({state.max_retries})")
             return (RestartDecision.STOP, 0)
         
         # Calculate delay with backoff
         if state.restart_count == 0:
-            delay = policy.retry_delay
+            delay = state.retry_delay
         else:
             delay = min(
-                state.current_delay * policy.backoff_multiplier,
-                policy.max_delay
+                state.current_delay * state.backoff_multiplier,
+                state.max_delay
             )
         
         # Update state
         state.restart_count += 1
         state.current_delay = int(delay)
-        state.last_restart = datetime.now()
+        state.last_restart_ns = time.monotonic_ns()
         
         if crashed:
             state.consecutive_failures += 1
@@ -242,17 +330,20 @@ class RestartPolicyManager:
         
         logger.info(
             f"Process '{process_name}' will restart in {delay}s "
-            f"(attempt {state.restart_count}/{policy.max_retries})"
+            f"(attempt {state.restart_count}/{state.max_retries})"
         )
         
         return (RestartDecision.RESTART, int(delay))
     
     def reset_restart_count(self, process_name: str) -> None:
         """Reset the restart count for a process."""
-        if process_name in self._restart_states:
-            self._restart_states[process_name].restart_count = 0
-            self._restart_states[process_name].consecutive_failures = 0
-            self._restart_states[process_name].current_delay = 0
+        with self._states_lock:
+            state = self._restart_states.get(process_name)
+        if state is not None:
+            with state.lock:
+                state.restart_count = 0
+                state.consecutive_failures = 0
+                state.current_delay = 0
             logger.info(f"Reset restart count for process '{process_name}'")
     
     def get_restart_state(self, process_name: str) -> Optional[RestartState]:
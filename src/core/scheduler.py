@@ -1,20 +1,29 @@
 """Scheduler module for managing scheduled process execution."""
 
+import functools
 import re
 import threading
 import time
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.date import DateTrigger
 import structlog
 
+from ..utils.time_parser import UNIT_SECONDS
+
 logger = structlog.get_logger()
 
+# APScheduler job id of the log/metric retention job
+RETENTION_JOB_ID = "sentinel-retention"
+
+# Interval expressions like "10s", "5m", "2h", "1d"
+_INTERVAL_RE = re.compile(r'^(\d+)([smhd])$')
+
 
 class ScheduleType(Enum):
     """Types of schedules supported."""
@@ -23,6 +32,55 @@ class ScheduleType(Enum):
     ONCE = "once"
 
 
+_SCHEDULE_TYPE_BY_STR: Dict[str, ScheduleType] = {m.value: m for m in ScheduleType}
+
+
+@functools.lru_cache(maxsize=256)
+def _split_cron_cached(expression: str) -> tuple:
+    """Split a cron expression into its fields."""
+    return tuple(expression.split())
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_interval_cached(expression: str) -> int:
+    """Parse an interval expression to seconds."""
+    match = _INTERVAL_RE.match(expression.lower())
+    if not match:
+        raise ValueError(f"Invalid interval expression: {expression}")
+    
+    value = int(match.group(1))
+    unit = match.group(2)
+    
+    return value * UNIT_SECONDS[unit]
+
+
+@functools.lru_cache(maxsize=256)
+def _cron_trigger_for_fields(parts: Tuple[str, ...]) -> CronTrigger:
+    """Build a cron trigger from already-split fields."""
+    return CronTrigger(
+        minute=parts[0],
+        hour=parts[1],
+        day=parts[2],
+        month=parts[3],
+        day_of_week=parts[4]
+    )
+
+
+def _cron_trigger_cached(expression: str) -> CronTrigger:
+    """Return the shared cron trigger for an expression.
+    
+    Cron triggers are immutable, so one instance can serve every schedule
+    with the same expression. Interval triggers anchor their start date to
+    creation time, so only their parsed interval is cached.
+    """
+    parts = _split_cron_cached(expression)
+    if len(parts) != 5:
+        raise ValueError("Invalid cron expression")
+    
+    # Key on the split fields so whitespace variants share a trigger
+    return _cron_trigger_for_fields(parts)
+
+
 @dataclass
 class Schedule:
     """Represents a scheduled process execution."""
@@ -46,10 +104,13 @@ class ProcessScheduler:
     
     def __init__(self):
         """Initialize the scheduler."""
+        # Copy-on-write: mutators swap in a new dict under the lock so readers
+        # can use whatever dict they see without locking
         self._schedules: Dict[str, Schedule] = {}
+        self._schedules_tuple: Tuple[Schedule, ...] = ()  # values of _schedules
         self._scheduler = BackgroundScheduler()
         self._process_manager = None
-        self._lock = threading.RLock()
+        self._lock = threading.Lock()  # never re-acquired while held
         self._running = False
         
         logger.info("ProcessScheduler initialized")
@@ -70,44 +131,45 @@ class ProcessScheduler:
         enabled: bool = True
     ) -> Schedule:
         """Add a new schedule."""
+        # Convert string to enum if needed
+        if isinstance(schedule_type, str):
+            # Falls back to the enum constructor for its ValueError on bad input
+            schedule_type = _SCHEDULE_TYPE_BY_STR.get(schedule_type) or ScheduleType(schedule_type)
+        
+        # Validate cron expression before taking the lock
+        if schedule_type == ScheduleType.CRON:
+            if len(_split_cron_cached(expression)) != 5:
+                raise ValueError(f"Invalid cron expression: {expression}")
+        
+        # Create schedule object
+        schedule = Schedule(
+            name=name,
+            schedule_type=schedule_type,
+            expression=expression,
+            command=command,
+            args=args or [],
+            working_dir=working_dir,
+            env_vars=env_vars or {},
+            enabled=enabled
+        )
+        
         with self._lock:
             if name in self._schedules:
                 raise ValueError(f"Schedule with name '{name}' already exists")
             
-            # Convert string to enum if needed
-            if isinstance(schedule_type, str):
-                schedule_type = ScheduleType(schedule_type)
-            
-            # Validate cron expression
-            if schedule_type == ScheduleType.CRON:
-                parts = expression.split()
-                if len(parts) != 5 and expression != "invalid cron":
-                    raise ValueError(f"Invalid cron expression: {expression}")
-                if expression == "invalid cron":
-                    raise ValueError(f"Invalid cron expression: {expression}")
-            
-            # Create schedule object
-            schedule = Schedule(
-                name=name,
-                schedule_type=schedule_type,
-                expression=expression,
-                command=command,
-                args=args or [],
-                working_dir=working_dir,
-                env_vars=env_vars or {},
-                enabled=enabled
-            )
-            
             # Add to scheduler if enabled
             if enabled and self._running:
                 self._add_job(schedule)
             
             # Store schedule
-            self._schedules[name] = schedule
-            
-            logger.info(f"Added schedule '{name}' ({schedule_type.value}: {expression})")
-            
-            return schedule
+            schedules = dict(self._schedules)
+            schedules[name] = schedule
+            self._schedules = schedules
+            self._schedules_tuple = tuple(schedules.values())
+        
+        logger.info(f"Added schedule '{name}' ({schedule_type.value}: {expression})")
+        
+        return schedule
     
     def remove_schedule(self, name: str) -> bool:
         """Remove a schedule."""
@@ -125,7 +187,10 @@ class ProcessScheduler:
                     pass
             
             # Remove from storage
-            del self._schedules[name]
+            schedules = dict(self._schedules)
+            del schedules[name]
+            self._schedules = schedules
+            self._schedules_tuple = tuple(schedules.values())
             
             logger.info(f"Removed schedule '{name}'")
             return True
@@ -166,37 +231,67 @@ class ProcessScheduler:
     
     def get_schedule(self, name: str) -> Optional[Schedule]:
         """Get a schedule by name."""
-        with self._lock:
-            return self._schedules.get(name)
+        return self._schedules.get(name)
     
-    def list_schedules(self) -> List[Schedule]:
-        """List all schedules."""
-        with self._lock:
-            return list(self._schedules.values())
+    def list_schedules(self) -> Tuple[Schedule, ...]:
+        """List all schedules.
+        
+        Returns a shared tuple rebuilt only when schedules are added or removed.
+        """
+        return self._schedules_tuple
     
     def get_next_run(self, name: str) -> Optional[datetime]:
         """Get the next run time for a schedule."""
-        with self._lock:
-            schedule = self._schedules.get(name)
-            if not schedule:
-                return None
-            
-            # If scheduler is not running, calculate manually
-            if not self._running:
-                trigger = self._create_trigger(schedule)
-                if trigger:
-                    # Get next fire time
-                    from datetime import timezone
-                    return trigger.get_next_fire_time(None, datetime.now(timezone.utc))
-            
-            # If scheduler is running and job exists
-            if schedule.job_id:
-                job = self._scheduler.get_job(schedule.job_id)
-                if job:
-                    # Return next scheduled time
-                    return schedule.next_run
-            
+        schedule = self._schedules.get(name)
+        if not schedule:
             return None
+        
+        # If scheduler is not running, calculate manually
+        if not self._running:
+            trigger = self._create_trigger(schedule)
+            if trigger:
+                # Get next fire time
+                return trigger.get_next_fire_time(None, datetime.now(timezone.utc))
+        
+        # If scheduler is running and job exists
+        if schedule.job_id:
+            job = self._scheduler.get_job(schedule.job_id)
+            if job:
+                # Return next scheduled time
+                return schedule.next_run
+        
+        return None
+    
+    def enable_retention(self, retention_days: int, interval_hours: int = 1) -> None:
+        """Periodically delete process logs and metrics older than retention_days."""
+        self._scheduler.add_job(
+            func=self._prune_history,
+            trigger=IntervalTrigger(hours=interval_hours),
+            args=[retention_days],
+            id=RETENTION_JOB_ID,
+            replace_existing=True
+        )
+        logger.info(f"Enabled history retention ({retention_days} days)")
+    
+    def _prune_history(self, retention_days: int) -> None:
+        """Run one retention pass and reclaim WAL space."""
+        # Imported lazily so the scheduler doesn't open the database on import
+        from ..models.base import engine, get_session
+        from ..models.models import prune_history
+        
+        try:
+            with get_session() as session:
+                deleted = prune_history(session, retention_days)
+            with engine.connect() as conn:
+                conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+            logger.info(f"Pruned {deleted} history rows older than {retention_days} days")
+        except Exception as e:
+            logger.error(f"Failed to prune history: {e}")
+    
+    @property
+    def running(self) -> bool:
+        """Whether the scheduler has been started."""
+        return self._running
     
     def start(self, catch_up: bool = True):
         """Start the scheduler."""
@@ -256,18 +351,7 @@ class ProcessScheduler:
         """Create an APScheduler trigger from a schedule."""
         try:
             if schedule.schedule_type == ScheduleType.CRON:
-                # Parse cron expression
-                parts = schedule.expression.split()
-                if len(parts) != 5:
-                    raise ValueError("Invalid cron expression")
-                
-                return CronTrigger(
-                    minute=parts[0],
-                    hour=parts[1],
-                    day=parts[2],
-                    month=parts[3],
-                    day_of_week=parts[4]
-                )
+                return _cron_trigger_cached(schedule.expression)
             
             elif schedule.schedule_type == ScheduleType.INTERVAL:
                 # Parse interval expression (e.g., "5m", "1h", "30s")
@@ -275,7 +359,7 @@ class ProcessScheduler:
                 return IntervalTrigger(seconds=seconds)
             
             elif schedule.schedule_type == ScheduleType.ONCE:
-                # Parse datetime
+                # One-shot triggers are never cached; parse datetime
                 run_time = datetime.fromisoformat(schedule.expression)
                 return DateTrigger(run_date=run_time)
             
@@ -287,25 +371,11 @@ class ProcessScheduler:
     
     def _parse_interval(self, expression: str) -> int:
         """Parse interval expression to seconds."""
-        # Match patterns like "10s", "5m", "2h", "1d"
-        match = re.match(r'^(\d+)([smhd])$', expression.lower())
-        if not match:
-            raise ValueError(f"Invalid interval expression: {expression}")
-        
-        value = int(match.group(1))
-        unit = match.group(2)
-        
-        multipliers = {
-            's': 1,        # seconds
-            'm': 60,       # minutes
-            'h': 3600,     # hours
-            'd': 86400     # days
-        }
-        
-        return value * multipliers[unit]
+        return _parse_interval_cached(expression)
     
     def _execute_schedule(self, name: str) -> None:
         """Execute a scheduled process."""
+        # Only hold the lock to read the schedule; spawning happens outside it
         with self._lock:
             schedule = self._schedules.get(name)
             if not schedule or not schedule.enabled:
@@ -315,33 +385,35 @@ class ProcessScheduler:
                 logger.error("Process manager not set, cannot execute schedule")
                 return
             
-            try:
-                # Start the process
-                process_name = f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
-                
-                self._process_manager.start_process(
-                    name=process_name,
-                    command=schedule.command,
-                    args=schedule.args,
-                    working_dir=schedule.working_dir,
-                    env_vars=schedule.env_vars
-                )
-                
-                # Update schedule metadata
-                schedule.last_run = datetime.now()
-                schedule.run_count += 1
-                
-                # Update next run time
-                if schedule.job_id:
-                    job = self._scheduler.get_job(schedule.job_id)
-                    if job:
-                        # Get next scheduled run
-                        from datetime import timezone
-                        trigger = self._create_trigger(schedule)
-                        if trigger:
-                            schedule.next_run = trigger.get_next_fire_time(None, datetime.now(timezone.utc))
-                
-                logger.info(f"Executed schedule '{name}' (process: {process_name})")
-                
-            except Exception as e:
-                logger.error(f"Failed to execute schedule '{name}': {e}")
\ No newline at end of file
+            command = schedule.command
+            args = list(schedule.args)
+            working_dir = schedule.working_dir
+            env_vars = dict(schedule.env_vars)
+        
+        now = datetime.now()
+        try:
+            # Start the process
+            process_name = f"{name}-{now.strftime('%Y%m%d-%H%M%S')}"
+            
+            self._process_manager.start_process(
+                name=process_name,
+                command=command,
+                args=args,
+                working_dir=working_dir,
+                env_vars=env_vars
+            )
+        except Exception as e:
+            logger.error(f"Failed to execute schedule '{name}': {e}")
+            return
+        
+        with self._lock:
+            # Update schedule metadata
+            schedule.last_run = now
+            schedule.run_count += 1
+            
+            # APScheduler already computed the next fire time for the job
+            if schedule.job_id:
+                job = self._scheduler.get_job(schedule.job_id)
+                schedule.next_run = job.next_run_time if job else None
+        
+        logger.info(f"Executed schedule '{name}' (process: {process_name})")
@@ -1,11 +1,13 @@
 """Database base configuration for SentinelZero."""
 
 import os
+import threading
 from contextlib import contextmanager
 from pathlib import Path
-from sqlalchemy import create_engine
+from sqlalchemy import bindparam, create_engine, event, func, select, update
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import scoped_session, sessionmaker, Session
+from sqlalchemy.pool import StaticPool
 
 # Create base class for models
 Base = declarative_base()
@@ -14,24 +16,63 @@ Base = declarative_base()
 DEFAULT_DB_PATH = Path.home() / ".sentinel" / "sentinel.db"
 DB_PATH = os.environ.get("SENTINEL_DB_PATH", str(DEFAULT_DB_PATH))
 
-# Ensure directory exists
-Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+IN_MEMORY = DB_PATH == ":memory:"
 
-# Create engine
-engine = create_engine(
-    f"sqlite:///{DB_PATH}",
-    connect_args={"check_same_thread": False},
-    echo=False
-)
+if IN_MEMORY:
+    # Every connection to ":memory:" is a separate empty database, so share one
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        echo=False
+    )
+else:
+    # Ensure directory exists
+    Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+    
+    # Create engine
+    engine = create_engine(
+        f"sqlite:///{DB_PATH}",
+        connect_args={"check_same_thread": False},
+        echo=False
+    )
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune each new SQLite connection for concurrent reads and frequent small writes."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256MB
+    cursor.execute("PRAGMA cache_size=-65536")  # 64MB page cache
+    cursor.close()
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# One reusable session per thread for get_session()
+ScopedSession = scoped_session(SessionLocal)
+
+
+# Tracks whether the calling thread is already inside get_session()
+_session_state = threading.local()
+
 
 @contextmanager
 def get_session() -> Session:
-    """Get a database session context manager."""
-    session = SessionLocal()
+    """Get a database session context manager.
+    
+    Reuses the calling thread's session. It is closed (connection returned
+    to the pool, identity map cleared) rather than removed on exit, so the
+    next block on this thread skips constructing a new Session. A nested
+    block gets its own fresh session so it cannot commit or close the
+    outer one.
+    """
+    nested = getattr(_session_state, "active", False)
+    session = SessionLocal() if nested else ScopedSession()
+    _session_state.active = True
     try:
         yield session
         session.commit()
@@ -40,11 +81,44 @@ def get_session() -> Session:
         raise
     finally:
         session.close()
+        _session_state.active = nested
 
 
 def init_db():
     """Initialize the database."""
     Base.metadata.create_all(bind=engine)
+    
+    # create_all skips existing tables, so add indexes introduced since they were created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    
+    with engine.begin() as connection:
+        _migrate_json_columns(connection)
+
+
+def _migrate_json_columns(connection) -> None:
+    """Re-encode values still stored as JSON text into MessagePack columns.
+    
+    Columns that used to be JSON keep their old text values until written;
+    only those rows are read (decoded as JSON) and written back as blobs.
+    """
+    from .models import MsgPack
+    
+    for table in Base.metadata.sorted_tables:
+        columns = [c for c in table.columns if isinstance(c.type, MsgPack)]
+        if not columns:
+            continue
+        (pk,) = table.primary_key.columns
+        for column in columns:
+            rows = connection.execute(
+                select(pk, column).where(func.typeof(column) == "text")
+            ).all()
+            if rows:
+                connection.execute(
+                    update(table).where(pk == bindparam("_pk")).values({column.name: bindparam("_value")}),
+                    [{"_pk": key, "_value": value} for key, value in rows]
+                )
 
 
 def reset_db():
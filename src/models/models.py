@@ -1,11 +1,50 @@
 """Database models for SentinelZero."""
 
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Boolean, Float, DateTime, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+import json
+from datetime import datetime, timedelta, timezone
+import msgpack
+from sqlalchemy import Column, Integer, String, Text, Boolean, Float, DateTime, ForeignKey, Index, LargeBinary, delete, text
+from sqlalchemy.orm import relationship, Session
+from sqlalchemy.types import TypeDecorator
 from .base import Base
 
 
+class MsgPack(TypeDecorator):
+    """Store Python values as MessagePack blobs.
+    
+    Values written by the earlier JSON columns come back from SQLite as text
+    and are still decoded; init_db() re-encodes any it finds as MessagePack.
+    """
+    impl = LargeBinary
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return msgpack.packb(value, use_bin_type=True)
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return json.loads(value)
+        return msgpack.unpackb(value, raw=False)
+
+
+# SQLite's CURRENT_TIMESTAMP only has one-second resolution; %f adds milliseconds
+_UTC_NOW_SQL = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+def _timestamp_column(**kwargs) -> Column:
+    """A DateTime column filled in by SQLite, as UTC with millisecond precision.
+    
+    SQL defaults compute the value inside the INSERT/UPDATE instead of in
+    Python per row. The client-side default keeps databases created before
+    the server_default was added working.
+    """
+    return Column(DateTime, default=text(_UTC_NOW_SQL), server_default=text(f"({_UTC_NOW_SQL})"), **kwargs)
+
+
 class Process(Base):
     """Process model."""
     __tablename__ = "processes"
@@ -13,16 +52,16 @@ class Process(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), unique=True, nullable=False, index=True)
     command = Column(Text, nullable=False)
-    args = Column(JSON, default=list)
+    args = Column(MsgPack, default=list)
     working_dir = Column(Text)
-    env_vars = Column(JSON, default=dict)
+    env_vars = Column(MsgPack, default=dict)
     status = Column(String(50), default="stopped", index=True)
     pid = Column(Integer)
     exit_code = Column(Integer)
     group_name = Column(String(255), index=True)
     restart_count = Column(Integer, default=0)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = _timestamp_column()
+    updated_at = _timestamp_column(onupdate=text(_UTC_NOW_SQL))
     started_at = Column(DateTime)
     stopped_at = Column(DateTime)
     
@@ -46,8 +85,8 @@ class Schedule(Base):
     last_run = Column(DateTime)
     next_run = Column(DateTime)
     run_count = Column(Integer, default=0)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = _timestamp_column()
+    updated_at = _timestamp_column(onupdate=text(_UTC_NOW_SQL))
     
     # Relationships
     process = relationship("Process", back_populates="schedules")
@@ -64,12 +103,12 @@ class RestartPolicyModel(Base):
     retry_delay = Column(Integer, default=5)
     backoff_multiplier = Column(Float, default=1.5)
     max_delay = Column(Integer, default=300)
-    restart_on_codes = Column(JSON)
-    ignore_codes = Column(JSON)
+    restart_on_codes = Column(MsgPack)
+    ignore_codes = Column(MsgPack)
     health_check_command = Column(Text)
     health_check_interval = Column(Integer, default=30)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = _timestamp_column()
+    updated_at = _timestamp_column(onupdate=text(_UTC_NOW_SQL))
     
     # Current restart state
     restart_count = Column(Integer, default=0)
@@ -83,12 +122,17 @@ class RestartPolicyModel(Base):
 class ProcessLog(Base):
     """Process log model."""
     __tablename__ = "process_logs"
+    __table_args__ = (
+        # Serves "logs for a process in a time range, newest first"
+        Index("ix_process_logs_proc_ts", "process_id", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     process_id = Column(Integer, ForeignKey("processes.id"), nullable=False)
     log_type = Column(String(50), nullable=False)  # stdout, stderr, system
     message = Column(Text)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    # Standalone index lets retention prune by age across all processes
+    timestamp = _timestamp_column(index=True)
     
     # Relationships
     process = relationship("Process", back_populates="logs")
@@ -97,13 +141,30 @@ class ProcessLog(Base):
 class Metric(Base):
     """Process metrics model."""
     __tablename__ = "metrics"
+    __table_args__ = (
+        Index("ix_metrics_proc_ts", "process_id", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     process_id = Column(Integer, ForeignKey("processes.id"), nullable=False)
     cpu_percent = Column(Float)
     memory_mb = Column(Float)
     num_threads = Column(Integer)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    timestamp = _timestamp_column(index=True)
     
     # Relationships
-    process = relationship("Process", back_populates="metrics")
\ No newline at end of file
+    process = relationship("Process", back_populates="metrics")
+
+
+def prune_history(session: Session, retention_days: int) -> int:
+    """Delete process logs and metrics older than retention_days.
+    
+    Returns:
+        Number of rows deleted
+    """
+    # Timestamps are stored as naive UTC (see _timestamp_column)
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=retention_days)
+    deleted = 0
+    for model in (ProcessLog, Metric):
+        deleted += session.execute(delete(model).where(model.timestamp < cutoff)).rowcount
+    return deleted
@@ -1,8 +1,18 @@
 """Time parsing utilities for handling various time formats."""
 
-import re
+import functools
+from types import MappingProxyType
 from typing import Union
 
+# Seconds per unit, shared with the scheduler's interval parser
+UNIT_SECONDS = MappingProxyType({
+    'w': 604800,  # weeks
+    'd': 86400,  # days
+    'h': 3600,   # hours
+    'm': 60,     # minutes
+    's': 1       # seconds
+})
+
 
 def parse_time_to_seconds(time_str: Union[str, int, float]) -> float:
     """Parse time string to seconds.
@@ -13,8 +23,10 @@ def parse_time_to_seconds(time_str: Union[str, int, float]) -> float:
     - Minutes: "30m" -> 1800 seconds
     - Hours: "5h" -> 18000 seconds
     - Days: "2d" -> 172800 seconds
+    - Weeks: "1w" -> 604800 seconds
     - Combined: "1h30m" -> 5400 seconds
     - Combined: "2d4h30m15s" -> 189015 seconds
+    - Trailing bare number counts as seconds: "1m30" -> 90 seconds
     
     Args:
         time_str: Time string or number
@@ -30,37 +42,55 @@ def parse_time_to_seconds(time_str: Union[str, int, float]) -> float:
     
     time_str = str(time_str).strip()
     
-    # If it's a plain number, return it as seconds
-    try:
-        return float(time_str)
-    except ValueError:
-        pass
-    
-    # Parse time format with units
+    # If it's a plain number, return it as seconds. Unit strings end in a
+    # letter, so only try float() when they can't be one and skip the
+    # raise/catch for the common "5m"/"1h30m" case
+    if not time_str[-1:].isalpha():
+        try:
+            return float(time_str)
+        except ValueError:
+            pass
+    
+    # Parse time format with units in a single pass over the string
+    text = time_str.lower()
     total_seconds = 0.0
-    
-    # Pattern to match time components
-    pattern = r'(\d+(?:\.\d+)?)\s*([dhms])'
-    matches = re.findall(pattern, time_str.lower())
-    
-    if not matches:
+    found = False
+    start = end = -1  # bounds of the number being read, -1 when none
+    
+    for i, ch in enumerate(text):
+        if '0' <= ch <= '9' or ch == '.':
+            if start < 0:
+                start = i
+            elif end != i:
+                # Whitespace inside a number, e.g. "1 2h"
+                raise ValueError(f"Invalid time format: {time_str}")
+            end = i + 1
+        elif ch in UNIT_SECONDS:
+            if start < 0:
+                raise ValueError(f"Invalid time format: {time_str}")
+            total_seconds += _to_float(text[start:end], time_str) * UNIT_SECONDS[ch]
+            found = True
+            start = end = -1
+        elif not ch.isspace():
+            raise ValueError(f"Invalid time unit: {ch}")
+    
+    if start >= 0:
+        total_seconds += _to_float(text[start:end], time_str)
+    elif not found:
         raise ValueError(f"Invalid time format: {time_str}")
     
-    units = {
-        'd': 86400,  # days
-        'h': 3600,   # hours
-        'm': 60,     # minutes
-        's': 1       # seconds
-    }
-    
-    for value, unit in matches:
-        if unit not in units:
-            raise ValueError(f"Invalid time unit: {unit}")
-        total_seconds += float(value) * units[unit]
-    
     return total_seconds
 
 
+def _to_float(value: str, time_str: str) -> float:
+    """Convert one numeric component, reporting the whole input on failure."""
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"Invalid time format: {time_str}") from None
+
+
+@functools.lru_cache(maxsize=1024)
 def format_seconds_to_human(seconds: float) -> str:
     """Format seconds to human-readable time string.
     
@@ -73,6 +103,23 @@ def format_seconds_to_human(seconds: float) -> str:
     if seconds < 1:
         return f"{seconds:.1f}s"
     
+    # Whole seconds: decompose with integer divmod instead of float division
+    if seconds == int(seconds):
+        days, rest = divmod(int(seconds), 86400)
+        hours, rest = divmod(rest, 3600)
+        minutes, secs = divmod(rest, 60)
+        
+        parts = []
+        if days:
+            parts.append(f"{days}d")
+        if hours:
+            parts.append(f"{hours}h")
+        if minutes:
+            parts.append(f"{minutes}m")
+        if secs or not parts:
+            parts.append(f"{secs}s")
+        return ''.join(parts)
+    
     parts = []
     
     # Days
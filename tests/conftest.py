@@ -0,0 +1,115 @@
+"""Shared pytest configuration."""
+
+import os
+
+import pytest
+
+# Keep tests off the user's database and, unless SENTINEL_TEST_DB_PATH asks
+# for a file, off the disk. This must happen before src.models.base is
+# imported, which conftest.py guarantees.
+os.environ["SENTINEL_DB_PATH"] = os.environ.get("SENTINEL_TEST_DB_PATH", ":memory:")
+
+from sqlalchemy import event  # noqa: E402
+
+from src.models.base import engine  # noqa: E402
+
+
+@event.listens_for(engine, "connect")
+def _fast_test_pragmas(dbapi_connection, connection_record):
+    """Trade durability for speed; test data is throwaway.
+    
+    Runs after the production pragmas, so these settings win.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+# pysqlite issues its own BEGIN lazily and ignores SAVEPOINT bookkeeping;
+# take over transaction control so db_transaction can roll back nested work.
+@event.listens_for(engine, "connect")
+def _manual_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture(scope="session")
+def _schema():
+    """Create the tables once per run."""
+    from src.models.base import init_db
+    
+    init_db()
+
+
+@pytest.fixture(autouse=True)
+def db_transaction(_schema):
+    """Run each test inside a transaction that is rolled back at teardown.
+    
+    Sessions handed out by get_session() join the outer transaction through
+    a SAVEPOINT, so their commits are undone without recreating tables.
+    """
+    from src.models.base import ScopedSession
+    
+    factory_kw = ScopedSession.session_factory.kw
+    saved_kw = dict(factory_kw)
+    connection = engine.connect()
+    transaction = connection.begin()
+    ScopedSession.remove()
+    ScopedSession.configure(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield connection
+    finally:
+        ScopedSession.remove()
+        factory_kw.clear()
+        factory_kw.update(saved_kw)
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def make_process():
+    """Insert Process rows straight into the database, bypassing the CLI/API."""
+    from src.models.base import get_session
+    from src.models.models import Process
+    
+    def _make(name, command, args=None, group=None, **fields):
+        with get_session() as session:
+            session.add(Process(name=name, command=command, args=args or [], group_name=group, **fields))
+    
+    return _make
+
+
+@pytest.fixture(scope="session")
+def app():
+    """The FastAPI app, imported on first use so non-API tests never build it."""
+    from src.api.main import app as _app
+    
+    # Pre-populating the schema short-circuits FastAPI's lazy OpenAPI generation
+    _app.openapi_schema = {
+        "openapi": "3.1.0",
+        "info": {"title": "SentinelZero API (tests)", "version": "test"},
+        "paths": {},
+    }
+    return _app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    """A TestClient shared by every API test; requests carry no client state."""
+    from fastapi.testclient import TestClient
+    
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def runner():
+    """A CliRunner shared by the CLI tests; each invoke() isolates its own I/O."""
+    from click.testing import CliRunner
+    
+    return CliRunner()
@@ -1,33 +1,44 @@
 """Tests for REST API endpoints."""
 
 import pytest
-from fastapi.testclient import TestClient
-from unittest.mock import Mock, patch, MagicMock
-import json
 
-from src.api.main import app
-from src.api.models.responses import ProcessResponse, ScheduleResponse, SystemStatusResponse
-from src.models.models import Process, Schedule, RestartPolicyModel as RestartPolicy
+# Skip the whole module in one item rather than erroring per test when the
+# API extras are missing.
+pytest.importorskip("fastapi", reason="FastAPI not installed")
 
+from types import SimpleNamespace  # noqa: E402
+from unittest.mock import Mock, patch  # noqa: E402
+
+import psutil  # noqa: E402
 
-@pytest.fixture
-def client():
-    """Create test client."""
-    return TestClient(app)
+
+def _override(app, dependency_name):
+    """Swap a router dependency for a fresh Mock until the test finishes."""
+    from src.api import deps
+    
+    dependency = getattr(deps, dependency_name)
+    mock = Mock()
+    app.dependency_overrides[dependency] = lambda: mock
+    yield mock
+    app.dependency_overrides.pop(dependency, None)
 
 
 @pytest.fixture
-def mock_process_manager():
+def mock_process_manager(app):
     """Mock process manager."""
-    with patch('src.api.routers.processes.process_manager') as mock:
-        yield mock
+    yield from _override(app, "get_process_manager")
 
 
 @pytest.fixture
-def mock_scheduler():
+def mock_scheduler(app):
     """Mock scheduler."""
-    with patch('src.api.routers.schedules.scheduler') as mock:
-        yield mock
+    yield from _override(app, "get_scheduler")
+
+
+@pytest.fixture
+def mock_config_manager(app):
+    """Mock config manager."""
+    yield from _override(app, "get_config_manager")
 
 
 class TestProcessEndpoints:
@@ -36,14 +47,10 @@ class TestProcessEndpoints:
     def test_list_processes(self, client, mock_process_manager):
         """Test GET /api/processes endpoint."""
         # Mock process data
-        mock_process = Mock()
-        mock_process.id = 1
-        mock_process.name = "test_process"
-        mock_process.command = "echo test"
-        mock_process.status = "running"
-        mock_process.pid = 12345
-        mock_process.cpu_percent = 5.2
-        mock_process.memory_mb = 128.5
+        mock_process = SimpleNamespace(
+            id=1, name="test_process", command="echo test", status="running",
+            pid=12345, cpu_percent=5.2, memory_mb=128.5, started_at=None
+        )
         
         mock_process_manager.get_all_processes.return_value = [mock_process]
         
@@ -58,14 +65,10 @@ class TestProcessEndpoints:
     
     def test_get_process(self, client, mock_process_manager):
         """Test GET /api/processes/{name} endpoint."""
-        mock_process = Mock()
-        mock_process.id = 1
-        mock_process.name = "test_process"
-        mock_process.command = "echo test"
-        mock_process.status = "running"
-        mock_process.pid = 12345
-        mock_process.cpu_percent = 5.2
-        mock_process.memory_mb = 128.5
+        mock_process = SimpleNamespace(
+            id=1, name="test_process", command="echo test", status="running",
+            pid=12345, cpu_percent=5.2, memory_mb=128.5, started_at=None
+        )
         
         mock_process_manager.get_process.return_value = mock_process
         
@@ -84,35 +87,23 @@ class TestProcessEndpoints:
         assert response.status_code == 404
         assert "not found" in response.json()["detail"].lower()
     
-    def test_start_process(self, client, mock_process_manager):
-        """Test POST /api/processes/{name}/start endpoint."""
-        mock_process_manager.start_process.return_value = True
+    @pytest.mark.parametrize("method,path,attr,message", [
+        ("post", "/api/processes/test_process/start", "start_process", "Process started successfully"),
+        ("post", "/api/processes/test_process/stop", "stop_process", "Process stopped successfully"),
+        ("post", "/api/processes/test_process/restart", "restart_process", "Process restarted successfully"),
+        ("delete", "/api/processes/test_process", "remove_process", "Process deleted successfully"),
+    ])
+    def test_process_action(self, client, mock_process_manager, mock_config_manager, method, path, attr, message):
+        """Test the per-process action endpoints."""
+        getattr(mock_process_manager, attr).return_value = True
         
-        response = client.post("/api/processes/test_process/start")
+        response = client.request(method, path)
         assert response.status_code == 200
-        assert response.json()["message"] == "Process started successfully"
+        assert response.json()["message"] == message
         
-        mock_process_manager.start_process.assert_called_once_with("test_process")
+        getattr(mock_process_manager, attr).assert_called_once_with("test_process")
     
-    def test_stop_process(self, client, mock_process_manager):
-        """Test POST /api/processes/{name}/stop endpoint."""
-        mock_process_manager.stop_process.return_value = True
-        
-        response = client.post("/api/processes/test_process/stop")
-        assert response.status_code == 200
-        assert response.json()["message"] == "Process stopped successfully"
-        
-        mock_process_manager.stop_process.assert_called_once_with("test_process")
-    
-    def test_restart_process(self, client, mock_process_manager):
-        """Test POST /api/processes/{name}/restart endpoint."""
-        mock_process_manager.restart_process.return_value = True
-        
-        response = client.post("/api/processes/test_process/restart")
-        assert response.status_code == 200
-        assert response.json()["message"] == "Process restarted successfully"
-    
-    def test_create_process(self, client, mock_process_manager):
+    def test_create_process(self, client, mock_process_manager, mock_config_manager):
         """Test POST /api/processes endpoint."""
         process_data = {
             "name": "new_process",
@@ -127,14 +118,6 @@ class TestProcessEndpoints:
         response = client.post("/api/processes", json=process_data)
         assert response.status_code == 201
         assert response.json()["message"] == "Process created successfully"
-    
-    def test_delete_process(self, client, mock_process_manager):
-        """Test DELETE /api/processes/{name} endpoint."""
-        mock_process_manager.remove_process.return_value = True
-        
-        response = client.delete("/api/processes/test_process")
-        assert response.status_code == 200
-        assert response.json()["message"] == "Process deleted successfully"
 
 
 class TestScheduleEndpoints:
@@ -142,14 +125,11 @@ class TestScheduleEndpoints:
     
     def test_list_schedules(self, client, mock_scheduler):
         """Test GET /api/schedules endpoint."""
-        mock_schedule = Mock()
-        mock_schedule.id = 1
-        mock_schedule.name = "daily_backup"
-        mock_schedule.process_name = "backup_script"
-        mock_schedule.schedule_type = "cron"
-        mock_schedule.cron_expression = "0 2 * * *"
-        mock_schedule.enabled = True
-        mock_schedule.next_run = "2025-01-02T02:00:00"
+        mock_schedule = SimpleNamespace(
+            id=1, name="daily_backup", process_name="backup_script", schedule_type="cron",
+            cron_expression="0 2 * * *", interval_seconds=None, enabled=True,
+            next_run="2025-01-02T02:00:00", last_run=None
+        )
         
         mock_scheduler.get_all_schedules.return_value = [mock_schedule]
         
@@ -163,14 +143,11 @@ class TestScheduleEndpoints:
     
     def test_get_schedule(self, client, mock_scheduler):
         """Test GET /api/schedules/{name} endpoint."""
-        mock_schedule = Mock()
-        mock_schedule.id = 1
-        mock_schedule.name = "daily_backup"
-        mock_schedule.process_name = "backup_script"
-        mock_schedule.schedule_type = "cron"
-        mock_schedule.cron_expression = "0 2 * * *"
-        mock_schedule.enabled = True
-        mock_schedule.next_run = "2025-01-02T02:00:00"
+        mock_schedule = SimpleNamespace(
+            id=1, name="daily_backup", process_name="backup_script", schedule_type="cron",
+            cron_expression="0 2 * * *", interval_seconds=None, enabled=True,
+            next_run="2025-01-02T02:00:00", last_run=None
+        )
         
         mock_scheduler.get_schedule.return_value = mock_schedule
         
@@ -180,7 +157,7 @@ class TestScheduleEndpoints:
         data = response.json()
         assert data["name"] == "daily_backup"
     
-    def test_create_schedule(self, client, mock_scheduler):
+    def test_create_schedule(self, client, mock_scheduler, mock_config_manager):
         """Test POST /api/schedules endpoint."""
         schedule_data = {
             "name": "hourly_task",
@@ -196,61 +173,86 @@ class TestScheduleEndpoints:
         assert response.status_code == 201
         assert response.json()["message"] == "Schedule created successfully"
     
-    def test_enable_schedule(self, client, mock_scheduler):
-        """Test POST /api/schedules/{name}/enable endpoint."""
-        mock_scheduler.enable_schedule.return_value = True
+    @pytest.mark.parametrize("method,path,attr,message", [
+        ("post", "/api/schedules/daily_backup/enable", "enable_schedule", "Schedule enabled successfully"),
+        ("post", "/api/schedules/daily_backup/disable", "disable_schedule", "Schedule disabled successfully"),
+        ("delete", "/api/schedules/daily_backup", "remove_schedule", "Schedule deleted successfully"),
+    ])
+    def test_schedule_action(self, client, mock_scheduler, mock_config_manager, method, path, attr, message):
+        """Test the per-schedule action endpoints."""
+        getattr(mock_scheduler, attr).return_value = True
+        mock_config_manager.get_config.return_value = SimpleNamespace(schedules=[])
         
-        response = client.post("/api/schedules/daily_backup/enable")
+        response = client.request(method, path)
         assert response.status_code == 200
-        assert response.json()["message"] == "Schedule enabled successfully"
-    
-    def test_disable_schedule(self, client, mock_scheduler):
-        """Test POST /api/schedules/{name}/disable endpoint."""
-        mock_scheduler.disable_schedule.return_value = True
+        assert response.json()["message"] == message
         
-        response = client.post("/api/schedules/daily_backup/disable")
-        assert response.status_code == 200
-        assert response.json()["message"] == "Schedule disabled successfully"
-    
-    def test_delete_schedule(self, client, mock_scheduler):
-        """Test DELETE /api/schedules/{name} endpoint."""
-        mock_scheduler.remove_schedule.return_value = True
-        
-        response = client.delete("/api/schedules/daily_backup")
-        assert response.status_code == 200
-        assert response.json()["message"] == "Schedule deleted successfully"
+        getattr(mock_scheduler, attr).assert_called_once_with("daily_backup")
 
 
 class TestSystemEndpoints:
     """Test system status and health endpoints."""
     
-    def test_health_check(self, client):
+    def test_health_check(self, client, monkeypatch):
         """Test GET /api/health endpoint."""
+        from src.api import deps
+        
+        # The health check reads the managers directly so that missing ones
+        # report "unhealthy" rather than failing the request
+        monkeypatch.setattr(deps, "process_manager", Mock())
+        monkeypatch.setattr(deps, "scheduler", SimpleNamespace(running=True))
+        
         response = client.get("/api/health")
         assert response.status_code == 200
         
         data = response.json()
         assert data["status"] == "healthy"
+        assert data["database"] == "ok"
         assert "timestamp" in data
     
-    def test_system_status(self, client, mock_process_manager, mock_scheduler):
+    def test_health_check_uninitialized(self, client):
+        """Test GET /api/health before the managers are initialized."""
+        response = client.get("/api/health")
+        assert response.status_code == 200
+        assert response.json()["status"] == "unhealthy"
+    
+    def test_lifespan_shutdown_closes_process_manager(self, app, monkeypatch):
+        """Test that API shutdown stops the scheduler and then closes the process manager."""
+        from fastapi.testclient import TestClient
+        from src.api import deps
+        
+        managers = Mock()
+        managers.config.load_config.return_value = SimpleNamespace(
+            processes=[], schedules=[], global_config=SimpleNamespace(log_retention_days=7)
+        )
+        monkeypatch.setattr(deps, "initialize_managers", lambda: None)
+        monkeypatch.setattr(deps, "process_manager", managers.process)
+        monkeypatch.setattr(deps, "scheduler", managers.scheduler)
+        monkeypatch.setattr(deps, "config_manager", managers.config)
+        
+        with TestClient(app):
+            managers.process.close.assert_not_called()
+        
+        shutdown = [name for name, _, _ in managers.mock_calls if name in ("scheduler.stop", "process.close")]
+        assert shutdown == ["scheduler.stop", "process.close"]
+    
+    def test_system_status(self, client, mock_process_manager, mock_scheduler, monkeypatch):
         """Test GET /api/status endpoint."""
-        # Mock data
-        mock_process_manager.get_all_processes.return_value = [Mock(), Mock()]
-        mock_scheduler.get_all_schedules.return_value = [Mock()]
-        
-        with patch('psutil.cpu_percent', return_value=25.5):
-            with patch('psutil.virtual_memory') as mock_mem:
-                mock_mem.return_value = Mock(percent=60.0)
-                
-                response = client.get("/api/status")
-                assert response.status_code == 200
-                
-                data = response.json()
-                assert data["total_processes"] == 2
-                assert data["total_schedules"] == 1
-                assert data["cpu_percent"] == 25.5
-                assert data["memory_percent"] == 60.0
+        mock_process_manager.get_all_processes.return_value = [
+            SimpleNamespace(status="running"), SimpleNamespace(status="stopped")
+        ]
+        mock_scheduler.get_all_schedules.return_value = [SimpleNamespace(enabled=True)]
+        monkeypatch.setattr(psutil, "cpu_percent", lambda interval=None: 25.5)
+        monkeypatch.setattr(psutil, "virtual_memory", lambda: SimpleNamespace(percent=60.0))
+        
+        response = client.get("/api/status")
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data["total_processes"] == 2
+        assert data["total_schedules"] == 1
+        assert data["cpu_percent"] == 25.5
+        assert data["memory_percent"] == 60.0
     
     def test_logs_endpoint(self, client):
         """Test GET /api/logs endpoint."""
@@ -270,25 +272,22 @@ class TestSystemEndpoints:
 class TestConfigEndpoints:
     """Test configuration management endpoints."""
     
-    def test_get_config(self, client):
+    def test_get_config(self, client, mock_config_manager):
         """Test GET /api/config endpoint."""
-        with patch('src.api.routers.config.config_manager') as mock_cm:
-            mock_config = Mock()
-            mock_config.export_config.return_value = {
-                "global": {"log_level": "INFO"},
-                "processes": [],
-                "schedules": []
-            }
-            mock_cm.get_config.return_value = mock_config
-            
-            response = client.get("/api/config")
-            assert response.status_code == 200
-            
-            data = response.json()
-            assert "global" in data
-            assert data["global"]["log_level"] == "INFO"
+        mock_config_manager.export_config.return_value = {
+            "global": {"log_level": "INFO"},
+            "processes": [],
+            "schedules": []
+        }
+        
+        response = client.get("/api/config")
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert "global" in data
+        assert data["global"]["log_level"] == "INFO"
     
-    def test_update_config(self, client):
+    def test_update_config(self, client, mock_config_manager):
         """Test PUT /api/config endpoint."""
         config_data = {
             "global": {
@@ -297,39 +296,37 @@ class TestConfigEndpoints:
             }
         }
         
-        with patch('src.api.routers.config.config_manager') as mock_cm:
-            mock_cm.import_config.return_value = None
-            mock_cm.save_config.return_value = None
-            
-            response = client.put("/api/config", json=config_data)
-            assert response.status_code == 200
-            assert response.json()["message"] == "Configuration updated successfully"
+        mock_config_manager.import_config.return_value = None
+        mock_config_manager.validate_config.return_value = []
+        mock_config_manager.save_config.return_value = None
+        
+        response = client.put("/api/config", json=config_data)
+        assert response.status_code == 200
+        assert response.json()["message"] == "Configuration updated successfully"
     
-    def test_validate_config(self, client):
+    def test_validate_config(self, client, mock_config_manager):
         """Test POST /api/config/validate endpoint."""
-        with patch('src.api.routers.config.config_manager') as mock_cm:
-            mock_cm.validate_config.return_value = []
-            
-            response = client.post("/api/config/validate")
-            assert response.status_code == 200
-            
-            data = response.json()
-            assert data["valid"] is True
-            assert data["errors"] == []
+        mock_config_manager.validate_config.return_value = []
+        
+        response = client.post("/api/config/validate")
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data["valid"] is True
+        assert data["errors"] == []
     
-    def test_validate_config_with_errors(self, client):
+    def test_validate_config_with_errors(self, client, mock_config_manager):
         """Test POST /api/config/validate with validation errors."""
-        with patch('src.api.routers.config.config_manager') as mock_cm:
-            mock_cm.validate_config.return_value = [
-                "Schedule 'test' references non-existent process 'missing'"
-            ]
-            
-            response = client.post("/api/config/validate")
-            assert response.status_code == 200
-            
-            data = response.json()
-            assert data["valid"] is False
-            assert len(data["errors"]) == 1
+        mock_config_manager.validate_config.return_value = [
+            "Schedule 'test' references non-existent process 'missing'"
+        ]
+        
+        response = client.post("/api/config/validate")
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data["valid"] is False
+        assert len(data["errors"]) == 1
 
 
 class TestRestartPolicyEndpoints:
@@ -338,11 +335,12 @@ class TestRestartPolicyEndpoints:
     def test_get_restart_policies(self, client):
         """Test GET /api/restart-policies endpoint."""
         with patch('src.api.routers.restart_policies.get_all_policies') as mock_get:
-            mock_policy = Mock()
-            mock_policy.process_name = "web_server"
-            mock_policy.max_retries = 3
-            mock_policy.retry_delay_seconds = 5
-            mock_policy.exponential_backoff = True
+            mock_policy = SimpleNamespace(
+                process_name="web_server", max_retries=3,
+                retry_delay_seconds=5, exponential_backoff=True,
+                restart_on_failure=True, restart_on_success=False,
+                success_codes=None, failure_codes=None
+            )
             
             mock_get.return_value = [mock_policy]
             
@@ -353,7 +351,7 @@ class TestRestartPolicyEndpoints:
             assert len(data) == 1
             assert data[0]["process_name"] == "web_server"
     
-    def test_create_restart_policy(self, client):
+    def test_create_restart_policy(self, client, mock_config_manager):
         """Test POST /api/restart-policies endpoint."""
         policy_data = {
             "process_name": "worker",
@@ -367,4 +365,8 @@ class TestRestartPolicyEndpoints:
             
             response = client.post("/api/restart-policies", json=policy_data)
             assert response.status_code == 201
-            assert response.json()["message"] == "Restart policy created successfully"
\ No newline at end of file
+            assert response.json()["message"] == "Restart policy created successfully"
+            
+            saved = mock_config_manager.get_config.return_value.restart_policies
+            saved.append.assert_called_once()
+            mock_config_manager.save_config.assert_called_once()
\ No newline at end of file
@@ -1,39 +1,56 @@
 """Tests for CLI bug fixes (Issues #10 and #11)."""
 
 import pytest
-import shlex
-from click.testing import CliRunner
-from unittest.mock import MagicMock, patch
+from dataclasses import replace
+from unittest.mock import patch
 from src.cli.main import cli, process_manager, policy_manager
 from src.core.process_manager import ProcessInfo, ProcessStatus
 from datetime import datetime
 
 
+@pytest.fixture
+def patched_apply():
+    """Stub out restart policy assignment done by `start`."""
+    with patch.object(policy_manager, 'apply_policy') as mock_apply:
+        yield mock_apply
+
+
+@pytest.fixture(scope="module")
+def _running_process_info():
+    return ProcessInfo(
+        name="test-process",
+        command="./script.sh",
+        status=ProcessStatus.RUNNING,
+        pid=12345,
+        started_at=datetime.now()
+    )
+
+
+@pytest.fixture
+def process_info(_running_process_info):
+    """Build a running ProcessInfo for mocked start_process calls, overriding fields as needed."""
+    def _make(**fields):
+        return replace(_running_process_info, **fields)
+    
+    return _make
+
+
 class TestIssue10CLIArgumentParsing:
     """Tests for Issue #10: CLI should accept long strings in -c and --args."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.runner = CliRunner()
-    
     @patch.object(process_manager, 'start_process')
-    @patch.object(policy_manager, 'apply_policy')
-    def test_command_with_long_string_shlex(self, mock_apply_policy, mock_start_process):
+    def test_command_with_long_string_shlex(self, mock_start_process, runner, patched_apply, process_info):
         """Test that commands with long strings are properly parsed using shlex."""
         # Mock the start_process to return a process info
-        mock_start_process.return_value = ProcessInfo(
+        mock_start_process.return_value = process_info(
             name="test-process",
             command="./script.sh",
-            args=["start a new project sentinel-zero, A macOS service that starts, monitors, schedules, and automatically restarts command-line processes with configurable retry policies."],
-            status=ProcessStatus.RUNNING,
-            pid=12345,
-            started_at=datetime.now(),
-            restart_count=0
+            args=["start a new project sentinel-zero, A macOS service that starts, monitors, schedules, and automatically restarts command-line processes with configurable retry policies."]
         )
         
         # Test with a long string in command
         long_string = "start a new project sentinel-zero, A macOS service that starts, monitors, schedules, and automatically restarts command-line processes with configurable retry policies."
-        result = self.runner.invoke(cli, [
+        result = runner.invoke(cli, [
             'start',
             '-n', 'test-process',
             '-c', f'./script.sh "{long_string}"',
@@ -53,23 +70,18 @@ class TestIssue10CLIArgumentParsing:
         assert long_string in ' '.join(call_args['args'])
     
     @patch.object(process_manager, 'start_process')
-    @patch.object(policy_manager, 'apply_policy')
-    def test_args_with_long_string(self, mock_apply_policy, mock_start_process):
+    def test_args_with_long_string(self, mock_start_process, runner, patched_apply, process_info):
         """Test that --args option accepts long strings."""
         # Mock the start_process to return a process info
-        mock_start_process.return_value = ProcessInfo(
+        mock_start_process.return_value = process_info(
             name="test-process",
             command="./orchestrate.sh",
-            args=["start a new project sentinel-zero, A macOS service that starts, monitors, schedules, and automatically restarts command-line processes"],
-            status=ProcessStatus.RUNNING,
-            pid=12345,
-            started_at=datetime.now(),
-            restart_count=0
+            args=["start a new project sentinel-zero, A macOS service that starts, monitors, schedules, and automatically restarts command-line processes"]
         )
         
         # Test with long string in --args
         long_arg = "start a new project sentinel-zero, A macOS service that starts, monitors, schedules, and automatically restarts command-line processes"
-        result = self.runner.invoke(cli, [
+        result = runner.invoke(cli, [
             'start',
             '-n', 'orchestrate-project',
             '-c', './orchestrate.sh',
@@ -90,20 +102,15 @@ class TestIssue10CLIArgumentParsing:
         assert 'macOS service' in args_str
     
     @patch.object(process_manager, 'start_process')
-    @patch.object(policy_manager, 'apply_policy')
-    def test_command_with_quotes_and_spaces(self, mock_apply_policy, mock_start_process):
+    def test_command_with_quotes_and_spaces(self, mock_start_process, runner, patched_apply, process_info):
         """Test commands with quotes and spaces are properly handled."""
-        mock_start_process.return_value = ProcessInfo(
+        mock_start_process.return_value = process_info(
             name="complex-cmd",
             command="python",
-            args=["script.py", "--message", "Hello World with spaces"],
-            status=ProcessStatus.RUNNING,
-            pid=12345,
-            started_at=datetime.now(),
-            restart_count=0
+            args=["script.py", "--message", "Hello World with spaces"]
         )
         
-        result = self.runner.invoke(cli, [
+        result = runner.invoke(cli, [
             'start',
             '-n', 'complex-cmd',
             '-c', 'python script.py --message "Hello World with spaces"',
@@ -121,66 +128,44 @@ class TestIssue10CLIArgumentParsing:
 class TestIssue11CustomRestartDelay:
     """Tests for Issue #11: Custom restart delay with time formats."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.runner = CliRunner()
-    
-    def test_parse_time_format_hours(self):
-        """Test parsing time format with hours (5h)."""
+    @pytest.mark.parametrize("value,expected", [
+        ("5h", 5 * 3600), ("2.5h", 2.5 * 3600), ("24h", 24 * 3600),
+        ("30m", 30 * 60), ("90m", 90 * 60), ("5.5m", 5.5 * 60),
+        ("45s", 45), ("120s", 120), ("0.5s", 0.5),
+        ("2d", 2 * 86400), ("0.5d", 0.5 * 86400), ("7d", 7 * 86400),
+        ("1w", 7 * 86400), ("1w2d", 9 * 86400),
+        # "m" is always minutes, never a million multiplier
+        ("3m", 180),
+        ("1h30m", 3600 + 1800), ("2d4h", 2 * 86400 + 4 * 3600), ("1h30m45s", 3600 + 1800 + 45),
+        # Plain numbers are seconds (backwards compatibility)
+        ("60", 60), ("3600", 3600), ("0", 0),
+    ])
+    def test_parse_time_format(self, value, expected):
+        """Test parsing single-unit, combined and plain time formats."""
         from src.utils.time_parser import parse_time_to_seconds
         
-        assert parse_time_to_seconds("5h") == 5 * 3600
-        assert parse_time_to_seconds("2.5h") == 2.5 * 3600
-        assert parse_time_to_seconds("24h") == 24 * 3600
+        assert parse_time_to_seconds(value) == expected
     
-    def test_parse_time_format_minutes(self):
-        """Test parsing time format with minutes (30m)."""
+    def test_parse_time_format_invalid(self):
+        """Test that malformed time strings are rejected."""
         from src.utils.time_parser import parse_time_to_seconds
         
-        assert parse_time_to_seconds("30m") == 30 * 60
-        assert parse_time_to_seconds("90m") == 90 * 60
-        assert parse_time_to_seconds("5.5m") == 5.5 * 60
-    
-    def test_parse_time_format_seconds(self):
-        """Test parsing time format with seconds (45s)."""
-        from src.utils.time_parser import parse_time_to_seconds
+        for value in ["", "h", "5x", "1 2h", "1.2.3m"]:
+            with pytest.raises(ValueError):
+                parse_time_to_seconds(value)
         
-        assert parse_time_to_seconds("45s") == 45
-        assert parse_time_to_seconds("120s") == 120
-        assert parse_time_to_seconds("0.5s") == 0.5
-    
-    def test_parse_time_format_days(self):
-        """Test parsing time format with days (2d)."""
-        from src.utils.time_parser import parse_time_to_seconds
-        
-        assert parse_time_to_seconds("2d") == 2 * 86400
-        assert parse_time_to_seconds("0.5d") == 0.5 * 86400
-        assert parse_time_to_seconds("7d") == 7 * 86400
-    
-    def test_parse_time_format_combined(self):
-        """Test parsing combined time formats."""
-        from src.utils.time_parser import parse_time_to_seconds
-        
-        assert parse_time_to_seconds("1h30m") == 3600 + 1800
-        assert parse_time_to_seconds("2d4h") == 2 * 86400 + 4 * 3600
-        assert parse_time_to_seconds("1h30m45s") == 3600 + 1800 + 45
-    
-    def test_parse_time_format_plain_number(self):
-        """Test parsing plain numbers (backwards compatibility)."""
-        from src.utils.time_parser import parse_time_to_seconds
-        
-        assert parse_time_to_seconds("60") == 60
-        assert parse_time_to_seconds("3600") == 3600
-        assert parse_time_to_seconds("0") == 0
+        # A trailing bare number counts as seconds
+        assert parse_time_to_seconds("1m30") == 90
     
+    @pytest.mark.parametrize("delay,expected", [("5h", 18000), ("30m", 1800), ("120s", 120), ("60", 60)])
     @patch.object(policy_manager, 'create_policy')
-    def test_restart_policy_with_custom_delay(self, mock_create_policy):
+    def test_restart_policy_with_custom_delay(self, mock_create_policy, runner, delay, expected):
         """Test creating restart policy with custom delay format."""
-        result = self.runner.invoke(cli, [
+        result = runner.invoke(cli, [
             'restart-policy',
             'create',
             '--name', 'custom-delay',
-            '--delay', '5h',
+            '--delay', delay,
             '--max-retries', '3'
         ])
         
@@ -188,25 +173,34 @@ class TestIssue11CustomRestartDelay:
         mock_create_policy.assert_called_once()
         call_args = mock_create_policy.call_args[1]
         assert call_args['name'] == 'custom-delay'
-        assert call_args['retry_delay'] == 18000  # 5 hours in seconds
+        assert call_args['retry_delay'] == expected
         assert call_args['max_retries'] == 3
     
+    @patch.object(process_manager, 'start_process')
+    def test_start_rejects_invalid_restart_delay(self, mock_start, runner):
+        """Test that a malformed --restart-delay fails before the process is started."""
+        result = runner.invoke(cli, [
+            'start',
+            '-n', 'bad-delay',
+            '-c', './script.sh',
+            '--restart-delay', '5x'
+        ])
+        
+        assert result.exit_code == 2
+        assert "Invalid value for '--restart-delay'" in result.output
+        mock_start.assert_not_called()
+    
     @patch.object(process_manager, 'start_process')
     @patch.object(policy_manager, 'create_policy')
-    @patch.object(policy_manager, 'apply_policy')
-    def test_start_process_with_custom_restart_delay(self, mock_apply, mock_create, mock_start):
+    def test_start_process_with_custom_restart_delay(self, mock_create, mock_start, runner, patched_apply, process_info):
         """Test starting a process with custom restart delay."""
-        mock_start.return_value = ProcessInfo(
+        mock_start.return_value = process_info(
             name="delayed-process",
             command="./script.sh",
-            args=[],
-            status=ProcessStatus.RUNNING,
-            pid=12345,
-            started_at=datetime.now(),
-            restart_count=0
+            args=[]
         )
         
-        result = self.runner.invoke(cli, [
+        result = runner.invoke(cli, [
             'start',
             '-n', 'delayed-process',
             '-c', './script.sh',
@@ -223,40 +217,27 @@ class TestIssue11CustomRestartDelay:
     
     @patch.object(process_manager, 'stop_process')
     @patch.object(process_manager, 'start_process')
-    @patch('src.cli.main.get_session')
     @patch('time.sleep')
-    def test_restart_command_with_delay(self, mock_sleep, mock_get_session, mock_start, mock_stop):
+    def test_restart_command_with_delay(self, mock_sleep, mock_start, mock_stop, runner, make_process, process_info):
         """Test restart command with custom delay."""
-        # Mock database session
-        mock_session = MagicMock()
-        mock_process = MagicMock()
-        mock_process.name = 'test-process'
-        mock_process.command = './script.sh'
-        mock_process.args = []
-        mock_process.working_dir = None
-        mock_process.env_vars = {}
-        mock_process.group_name = None
-        
-        mock_session.query.return_value.filter_by.return_value.first.return_value = mock_process
-        mock_get_session.return_value.__enter__.return_value = mock_session
+        make_process("delayed-restart", "./script.sh")
         
-        mock_start.return_value = ProcessInfo(
-            name="test-process",
+        mock_start.return_value = process_info(
+            name="delayed-restart",
             command="./script.sh",
             args=[],
-            status=ProcessStatus.RUNNING,
             pid=67890,
-            started_at=datetime.now(),
             restart_count=1
         )
         
-        result = self.runner.invoke(cli, [
+        result = runner.invoke(cli, [
             'restart',
-            'test-process',
+            'delayed-restart',
             '--delay', '30s'
         ])
         
         assert result.exit_code == 0
-        mock_stop.assert_called_once_with('test-process', force=False)
+        mock_stop.assert_called_once_with('delayed-restart', force=False)
         mock_sleep.assert_called_once_with(30.0)
-        mock_start.assert_called_once()
\ No newline at end of file
+        mock_start.assert_called_once()
+        assert mock_start.call_args[1]['command'] == './script.sh'
\ No newline at end of file
@@ -1,8 +1,5 @@
 """Tests for configuration management system."""
 
-import os
-import tempfile
-from pathlib import Path
 import pytest
 import yaml
 from pydantic import ValidationError
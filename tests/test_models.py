@@ -0,0 +1,143 @@
+"""Tests for the database models."""
+
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from src.models.base import get_session
+from src.models.models import Metric, Process, ProcessLog, prune_history
+
+
+def _process_id(make_process, name="history-proc"):
+    make_process(name, "echo")
+    with get_session() as session:
+        return session.query(Process).filter_by(name=name).one().id
+
+
+class TestPruneHistory:
+    """Tests for log and metric retention."""
+    
+    def test_prune_history_deletes_only_old_rows(self, make_process):
+        """Test that rows older than the retention window are removed."""
+        process_id = _process_id(make_process)
+        old = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=10)
+        
+        with get_session() as session:
+            session.add_all([
+                ProcessLog(process_id=process_id, log_type="stdout", message="old", timestamp=old),
+                ProcessLog(process_id=process_id, log_type="stdout", message="new"),
+                Metric(process_id=process_id, cpu_percent=1.0, timestamp=old),
+                Metric(process_id=process_id, cpu_percent=2.0),
+            ])
+        
+        with get_session() as session:
+            assert prune_history(session, retention_days=7) == 2
+        
+        with get_session() as session:
+            assert [log.message for log in session.query(ProcessLog)] == ["new"]
+            assert [m.cpu_percent for m in session.query(Metric)] == [2.0]
+    
+    def test_prune_history_uses_timestamp_index(self, db_transaction):
+        """Test that the retention DELETE searches an index instead of scanning."""
+        for table in ("process_logs", "metrics"):
+            plan = db_transaction.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN DELETE FROM {table} WHERE timestamp < '2000-01-01'"
+            ).fetchall()
+            detail = " ".join(row[-1] for row in plan)
+            assert "USING INDEX" in detail, detail
+
+
+class TestTimestamps:
+    """Tests for database-generated timestamps."""
+    
+    def test_timestamps_keep_sub_second_order(self, make_process):
+        """Test that rows written within one second still sort newest first."""
+        process_id = _process_id(make_process, "ordered-proc")
+        
+        for i in range(3):
+            with get_session() as session:
+                session.add(ProcessLog(process_id=process_id, log_type="stdout", message=str(i)))
+            time.sleep(0.005)
+        
+        with get_session() as session:
+            rows = session.query(ProcessLog).order_by(ProcessLog.timestamp.desc()).all()
+            assert [row.message for row in rows] == ["2", "1", "0"]
+            assert len({row.timestamp for row in rows}) == 3
+            assert any(row.timestamp.microsecond for row in rows)
+
+
+class TestMsgPack:
+    """Tests for MessagePack-encoded columns."""
+    
+    def test_round_trip(self, make_process):
+        """Test that lists and dicts come back unchanged and are stored as blobs."""
+        make_process("packed", "echo", args=["-n", "hello", 3], env_vars={"PATH": "/bin", "DEBUG": True})
+        
+        with get_session() as session:
+            process = session.query(Process).filter_by(name="packed").one()
+            assert process.args == ["-n", "hello", 3]
+            assert process.env_vars == {"PATH": "/bin", "DEBUG": True}
+            
+            raw = session.execute(
+                text("SELECT typeof(args), typeof(env_vars) FROM processes WHERE name = 'packed'")
+            ).one()
+            assert tuple(raw) == ("blob", "blob")
+    
+    def test_reads_legacy_json_text(self, make_process):
+        """Test that rows written by the old JSON columns are still decoded."""
+        make_process("legacy", "echo")
+        
+        with get_session() as session:
+            session.execute(
+                text("UPDATE processes SET args = :args, env_vars = :env WHERE name = 'legacy'"),
+                {"args": json.dumps(["--port", "8080"]), "env": json.dumps({"MODE": "prod"})},
+            )
+        
+        with get_session() as session:
+            process = session.query(Process).filter_by(name="legacy").one()
+            assert process.args == ["--port", "8080"]
+            assert process.env_vars == {"MODE": "prod"}
+
+
+class TestGetSession:
+    """Tests for the get_session context manager."""
+    
+    def test_nested_session_leaves_outer_open(self, make_process):
+        """Test that a nested block neither shares nor closes the outer session."""
+        make_process("outer", "echo")
+        
+        with get_session() as outer:
+            process = outer.query(Process).filter_by(name="outer").one()
+            with get_session() as inner:
+                assert inner is not outer
+                inner.query(Process).count()
+            
+            # Still attached: the inner block did not close the outer session
+            assert process in outer
+            process.working_dir = "/srv"
+        
+        with get_session() as session:
+            assert session.query(Process).filter_by(name="outer").one().working_dir == "/srv"
+    
+    def test_migrate_json_columns(self, make_process, db_transaction):
+        """Test that the startup migration rewrites legacy JSON text as blobs."""
+        from src.models.base import _migrate_json_columns
+        
+        make_process("migrated", "echo")
+        db_transaction.execute(
+            text("UPDATE processes SET args = :args, env_vars = :env WHERE name = 'migrated'"),
+            {"args": json.dumps(["-v"]), "env": json.dumps({"A": "1"})},
+        )
+        
+        _migrate_json_columns(db_transaction)
+        
+        raw = db_transaction.execute(
+            text("SELECT typeof(args), typeof(env_vars) FROM processes WHERE name = 'migrated'")
+        ).one()
+        assert tuple(raw) == ("blob", "blob")
+        with get_session() as session:
+            process = session.query(Process).filter_by(name="migrated").one()
+            assert process.args == ["-v"]
+            assert process.env_vars == {"A": "1"}
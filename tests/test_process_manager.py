@@ -1,11 +1,20 @@
 """Tests for the process manager module."""
 
 import os
-import signal
 import time
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from src.core.process_manager import ProcessManager, ProcessStatus, ProcessInfo
+from src.core.process_manager import ProcessManager, ProcessStatus
+from src.core.restart_policy import RestartPolicyManager
+
+
+def wait_for(predicate, timeout=5.0, interval=0.02):
+    """Poll until predicate() is truthy instead of sleeping a fixed time."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(interval)
+    return True
 
 
 class TestProcessManager:
@@ -14,7 +23,15 @@ class TestProcessManager:
     @pytest.fixture
     def manager(self):
         """Create a ProcessManager instance for testing."""
-        return ProcessManager()
+        manager = ProcessManager()
+        yield manager
+        manager.close()
+
+    @pytest.fixture
+    def running_process(self, manager):
+        """Start a long-running process; the manager fixture stops it on teardown."""
+        manager.start_process("test-running", "sleep", ["10"])
+        return "test-running"
 
     def test_start_process_success(self, manager):
         """Test starting a process successfully."""
@@ -32,11 +49,7 @@ class TestProcessManager:
         assert process_info.pid > 0
         
         # Wait for process to complete
-        time.sleep(1)
-        
-        # Check process completed
-        status = manager.get_status("test-echo")
-        assert status == ProcessStatus.STOPPED
+        assert wait_for(lambda: manager.get_status("test-echo") == ProcessStatus.STOPPED)
 
     def test_start_process_duplicate_name(self, manager):
         """Test that starting a process with duplicate name raises error."""
@@ -48,25 +61,25 @@ class TestProcessManager:
         # Cleanup
         manager.stop_process("test-process")
 
-    def test_stop_process_success(self, manager):
+    def test_stop_process_success(self, manager, running_process):
         """Test stopping a running process."""
-        manager.start_process("test-sleep", "sleep", ["10"])
-        
-        result = manager.stop_process("test-sleep", timeout=5)
+        result = manager.stop_process(running_process, timeout=5)
         assert result is True
         
-        status = manager.get_status("test-sleep")
+        status = manager.get_status(running_process)
         assert status == ProcessStatus.STOPPED
 
-    def test_stop_process_force(self, manager):
+    def test_stop_process_force(self, manager, running_process):
         """Test force stopping a process."""
-        manager.start_process("test-force", "sleep", ["100"])
-        
-        result = manager.stop_process("test-force", force=True)
+        result = manager.stop_process(running_process, force=True)
         assert result is True
         
-        status = manager.get_status("test-force")
+        status = manager.get_status(running_process)
         assert status == ProcessStatus.STOPPED
+        assert manager.get_process_info(running_process).exit_code == -9
+        
+        # The killed child was reaped, so the monitor sees nothing pending
+        assert not manager._any_exited()
 
     def test_stop_nonexistent_process(self, manager):
         """Test stopping a process that doesn't exist."""
@@ -123,12 +136,8 @@ class TestProcessManager:
             capture_output=True
         )
         
-        # Wait for process to complete
-        time.sleep(0.1)
-        
-        output = manager.get_process_output("test-output")
-        assert output is not None
-        assert "Test output" in output.get("stdout", "")
+        # Wait for the output to arrive
+        assert wait_for(lambda: "Test output" in manager.get_process_output("test-output").get("stdout", ""))
 
     def test_process_with_environment_variables(self, manager):
         """Test process execution with custom environment variables."""
@@ -140,25 +149,17 @@ class TestProcessManager:
             capture_output=True
         )
         
-        # Wait for completion
-        time.sleep(0.1)
-        
-        output = manager.get_process_output("test-env")
-        assert "custom_value" in output.get("stdout", "")
+        # Wait for the output to arrive
+        assert wait_for(lambda: "custom_value" in manager.get_process_output("test-env").get("stdout", ""))
 
-    def test_process_monitoring(self, manager):
+    def test_process_monitoring(self, manager, running_process):
         """Test monitoring process resource usage."""
-        manager.start_process("test-monitor", "sleep", ["2"])
-        
-        metrics = manager.get_process_metrics("test-monitor")
+        metrics = manager.get_process_metrics(running_process)
         assert metrics is not None
         assert "cpu_percent" in metrics
         assert "memory_mb" in metrics
         assert metrics["cpu_percent"] >= 0
         assert metrics["memory_mb"] > 0
-        
-        # Cleanup
-        manager.stop_process("test-monitor")
 
     def test_process_crash_detection(self, manager):
         """Test detection of process crashes."""
@@ -170,22 +171,67 @@ class TestProcessManager:
         )
         
         # Wait for process to exit
-        time.sleep(0.5)
-        
-        status = manager.get_status("test-crash")
-        assert status == ProcessStatus.FAILED
+        assert wait_for(lambda: manager.get_status("test-crash") == ProcessStatus.FAILED)
         
         info = manager.get_process_info("test-crash")
         assert info.exit_code == 1
 
+    def test_restart_policy_on_crash(self, manager):
+        """Test that crashed processes are restarted according to their policy."""
+        policy_manager = RestartPolicyManager()
+        policy_manager.create_policy("once", max_retries=1, retry_delay=0)
+        policy_manager.apply_policy("test-auto-restart", "once")
+        manager.set_restart_policy_manager(policy_manager)
+        
+        manager.start_process("test-auto-restart", "sh", ["-c", "exit 3"])
+        
+        # Wait for the crash, the restart and the second crash
+        info = manager.get_process_info("test-auto-restart")
+        assert wait_for(lambda: info.restart_count == 1 and info.status == ProcessStatus.FAILED)
+        assert info.exit_code == 3
+
+    def test_stop_cancels_pending_restart(self, manager):
+        """Test that stopping a crashed process during its retry delay prevents the restart."""
+        policy_manager = RestartPolicyManager()
+        policy_manager.create_policy("delayed", max_retries=3, retry_delay=1)
+        policy_manager.apply_policy("test-stop-pending", "delayed")
+        manager.set_restart_policy_manager(policy_manager)
+        
+        manager.start_process("test-stop-pending", "sh", ["-c", "exit 3"])
+        
+        # The restart has been decided once the policy counted it
+        assert wait_for(lambda: policy_manager.get_restart_state("test-stop-pending").restart_count == 1)
+        manager.stop_process("test-stop-pending")
+        
+        time.sleep(1.5)
+        info = manager.get_process_info("test-stop-pending")
+        assert info.restart_count == 0
+        assert info.status == ProcessStatus.STOPPED
+
+    def test_clean_exit_follows_policy(self, manager):
+        """Test that exit code 0 restarts unless the policy ignores it."""
+        policy_manager = RestartPolicyManager()
+        policy_manager.create_policy("always", max_retries=1, retry_delay=0)
+        policy_manager.create_policy("one-shot", max_retries=1, retry_delay=0, ignore_codes=[0])
+        policy_manager.apply_policy("test-always", "always")
+        policy_manager.apply_policy("test-one-shot", "one-shot")
+        manager.set_restart_policy_manager(policy_manager)
+        
+        always = manager.start_process("test-always", "true")
+        one_shot = manager.start_process("test-one-shot", "true")
+        
+        assert wait_for(lambda: always.restart_count == 1 and always.status == ProcessStatus.STOPPED)
+        assert one_shot.status == ProcessStatus.STOPPED
+        assert one_shot.restart_count == 0
+
     def test_restart_process(self, manager):
         """Test restarting a process."""
         # Start initial process
-        info1 = manager.start_process("test-restart", "sleep", ["1"])
+        info1 = manager.start_process("test-restart", "sleep", ["0.2"])
         pid1 = info1.pid
         
         # Wait for it to complete
-        time.sleep(1.1)
+        assert wait_for(lambda: manager.get_status("test-restart") == ProcessStatus.STOPPED)
         
         # Restart the process
         info2 = manager.restart_process("test-restart")
@@ -193,10 +239,19 @@ class TestProcessManager:
         
         assert pid1 != pid2
         assert info2.status == ProcessStatus.RUNNING
+        assert info2.restart_count == 1
+        assert manager.get_process_info("test-restart") is info2
         
         # Cleanup
         manager.stop_process("test-restart")
 
+    def test_close(self, manager, running_process):
+        """Test that closing the manager stops processes and its monitor."""
+        manager.close()
+        
+        assert manager.get_status(running_process) == ProcessStatus.STOPPED
+        assert not manager._monitor_thread.is_alive()
+
     def test_process_group_management(self, manager):
         """Test managing processes as groups."""
         # Start processes in same group
@@ -234,8 +289,46 @@ class TestProcessManager:
                 capture_output=True
             )
             
-            # Wait for completion
-            time.sleep(0.1)
-            
-            output = manager.get_process_output("test-cwd")
-            assert "test.txt" in output.get("stdout", "")
\ No newline at end of file
+            # Wait for the output to arrive
+            assert wait_for(lambda: "test.txt" in manager.get_process_output("test-cwd").get("stdout", ""))
+
+    def test_capture_large_output(self, manager):
+        """Test that output larger than the pipe buffer is fully captured."""
+        manager.start_process(
+            name="test-large-output",
+            command="sh",
+            args=["-c", "head -c 200000 /dev/zero | tr '\\0' 'a'; printf 'tail'"],
+            capture_output=True
+        )
+        
+        # Wait for the whole output to arrive
+        assert wait_for(lambda: len(manager.get_process_output("test-large-output").get("stdout", "")) == 200004)
+        assert manager.get_process_output("test-large-output")["stdout"].endswith("tail")
+    
+    def test_output_tail(self, manager):
+        """Test reading the last lines of a single stream."""
+        manager.start_process(
+            name="test-tail",
+            command="sh",
+            args=["-c", "printf 'one\\ntwo\\nthree\\n'; echo oops >&2"],
+            capture_output=True
+        )
+        
+        assert wait_for(lambda: manager.get_process_output_tail("test-tail", "stderr") == ["oops"])
+        assert wait_for(lambda: manager.get_process_output_tail("test-tail", "stdout", 2) == ["two", "three"])
+        assert manager.get_process_output_tail("test-tail", "stdout", 10) == ["one", "two", "three"]
+        assert manager.get_process_output_tail("test-tail", "stdout", 0) == []
+        assert manager.get_process_output_tail("missing") is None
+    
+    def test_output_buffer_is_bounded(self, manager, monkeypatch):
+        """Test that captured output keeps only the newest bytes."""
+        monkeypatch.setattr("src.core.process_manager._MAX_OUTPUT_BYTES", 1000)
+        manager.start_process(
+            name="test-bounded",
+            command="sh",
+            args=["-c", "head -c 5000 /dev/zero | tr '\\0' 'a'; printf 'tail'"],
+            capture_output=True
+        )
+        
+        assert wait_for(lambda: manager.get_process_output("test-bounded")["stdout"].endswith("tail"))
+        assert len(manager.get_process_output("test-bounded")["stdout"]) == 1000
@@ -0,0 +1,133 @@
+"""Tests for the restart policy module."""
+
+import threading
+
+import pytest
+from src.core.restart_policy import RestartPolicyManager, RestartDecision
+
+
+class TestRestartPolicyManager:
+    """Test suite for RestartPolicyManager class."""
+
+    @pytest.fixture
+    def manager(self):
+        """Create a RestartPolicyManager instance for testing."""
+        return RestartPolicyManager()
+
+    def test_default_policies(self, manager):
+        """Test that the built-in policies are available."""
+        names = {p.name for p in manager.list_policies()}
+        assert {"standard", "aggressive", "conservative", "none"} <= names
+
+    def test_should_restart_without_policy(self, manager):
+        """Test that processes without a policy are not restarted."""
+        assert manager.should_restart("unknown", 1) == (RestartDecision.STOP, 0)
+
+    def test_should_restart_with_backoff(self, manager):
+        """Test restart delays grow with the backoff multiplier."""
+        manager.create_policy("custom", max_retries=3, retry_delay=10, backoff_multiplier=2.0, max_delay=30)
+        manager.apply_policy("worker", "custom")
+
+        assert manager.should_restart("worker", 1, crashed=True) == (RestartDecision.RESTART, 10)
+        assert manager.should_restart("worker", 1, crashed=True) == (RestartDecision.RESTART, 20)
+        assert manager.should_restart("worker", 1, crashed=True) == (RestartDecision.RESTART, 30)
+        assert manager.should_restart("worker", 1, crashed=True) == (RestartDecision.STOP, 0)
+
+        state = manager.get_restart_state("worker")
+        assert state.restart_count == 3
+        assert state.consecutive_failures == 3
+        assert state.last_restart is not None
+        assert 0 <= state.seconds_since_last_restart < 5
+
+    def test_exit_code_filters(self, manager):
+        """Test restart_on_codes and ignore_codes handling."""
+        manager.create_policy("only-2", restart_on_codes=[2])
+        manager.create_policy("ignore-0", ignore_codes=[0])
+        manager.apply_policy("a", "only-2")
+        manager.apply_policy("b", "ignore-0")
+
+        assert manager.should_restart("a", 1)[0] == RestartDecision.STOP
+        assert manager.should_restart("a", 2)[0] == RestartDecision.RESTART
+        assert manager.should_restart("b", 0)[0] == RestartDecision.STOP
+        assert manager.should_restart("b", 1)[0] == RestartDecision.RESTART
+
+    def test_clean_exit_restarts_unless_ignored(self, manager):
+        """Test that exit code 0 restarts under an unrestricted policy unless ignored."""
+        manager.create_policy("one-shot", ignore_codes=[0])
+        manager.apply_policy("default", "standard")
+        manager.apply_policy("one-shot", "one-shot")
+
+        assert manager.should_restart("default", 0)[0] == RestartDecision.RESTART
+        assert manager.should_restart("one-shot", 0)[0] == RestartDecision.STOP
+
+    def test_exit_code_filters_combined_and_updated(self, manager):
+        """Test ignore_codes wins over restart_on_codes and updates recompile the filter."""
+        manager.create_policy("mixed", restart_on_codes=[1, 2], ignore_codes=[2])
+        manager.apply_policy("worker", "mixed")
+
+        assert manager.should_restart("worker", 2)[0] == RestartDecision.STOP
+        assert manager.should_restart("worker", 1)[0] == RestartDecision.RESTART
+
+        manager.update_policy("mixed", ignore_codes=None)
+        assert manager.should_restart("worker", 2)[0] == RestartDecision.RESTART
+
+    def test_update_policy_applies_to_processes(self, manager):
+        """Test that policy updates affect processes already using it."""
+        manager.create_policy("custom", max_retries=1, retry_delay=5)
+        manager.apply_policy("worker", "custom")
+
+        manager.update_policy("custom", max_retries=0)
+
+        assert manager.should_restart("worker", 1) == (RestartDecision.STOP, 0)
+
+    def test_update_builtin_policy_is_per_manager(self, manager):
+        """Test that editing a built-in policy does not leak into other managers."""
+        manager.update_policy("standard", max_retries=7)
+
+        assert manager.get_policy("standard").max_retries == 7
+        assert RestartPolicyManager().get_policy("standard").max_retries == 3
+
+    def test_builtin_policies_are_returned_as_copies(self, manager):
+        """Test that mutating a returned built-in policy does not leak into other managers."""
+        manager.get_policy("standard").max_retries = 99
+        next(p for p in manager.list_policies() if p.name == "aggressive").retry_delay = 99
+
+        other = RestartPolicyManager()
+        assert manager.get_policy("standard").max_retries == 3
+        assert other.get_policy("standard").max_retries == 3
+        assert other.get_policy("aggressive").retry_delay == 1
+
+    def test_reset_restart_count(self, manager):
+        """Test resetting the restart count."""
+        manager.apply_policy("worker", "standard")
+        manager.should_restart("worker", 1)
+
+        manager.reset_restart_count("worker")
+
+        state = manager.get_restart_state("worker")
+        assert state.restart_count == 0
+        assert state.current_delay == 0
+
+    def test_concurrent_should_restart(self, manager):
+        """Test that concurrent decisions never exceed max_retries."""
+        manager.create_policy("custom", max_retries=50, retry_delay=0)
+        manager.apply_policy("worker", "custom")
+        results = []
+
+        def decide():
+            for _ in range(20):
+                results.append(manager.should_restart("worker", 1)[0])
+
+        threads = [threading.Thread(target=decide) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results.count(RestartDecision.RESTART) == 50
+        assert manager.get_restart_state("worker").restart_count == 50
+
+    def test_delete_builtin_policy(self, manager):
+        """Test that built-in policies cannot be deleted."""
+        with pytest.raises(ValueError, match="Cannot delete built-in policy 'standard'"):
+            manager.delete_policy("standard")
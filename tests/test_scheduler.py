@@ -3,8 +3,8 @@
 import time
 from datetime import datetime, timedelta
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from src.core.scheduler import ProcessScheduler, ScheduleType, Schedule
+from unittest.mock import Mock
+from src.core.scheduler import RETENTION_JOB_ID, ProcessScheduler, ScheduleType
 
 
 class TestProcessScheduler:
@@ -170,28 +170,33 @@ class TestProcessScheduler:
         assert next_run > now
         assert (next_run - now).total_seconds() <= 60
     
-    def test_interval_parsing(self, scheduler, mock_process_manager):
+    @pytest.mark.parametrize("expression,expected_seconds", [
+        ("10s", 10),      # 10 seconds
+        ("5m", 300),      # 5 minutes
+        ("2h", 7200),     # 2 hours
+        ("1d", 86400),    # 1 day
+    ])
+    def test_interval_parsing(self, scheduler, mock_process_manager, expression, expected_seconds):
         """Test parsing of interval expressions."""
         scheduler.set_process_manager(mock_process_manager)
         
-        # Test various interval formats
-        test_cases = [
-            ("10s", 10),      # 10 seconds
-            ("5m", 300),      # 5 minutes
-            ("2h", 7200),     # 2 hours
-            ("1d", 86400),    # 1 day
-        ]
-        
-        for expression, expected_seconds in test_cases:
-            schedule = scheduler.add_schedule(
-                name=f"test-{expression}",
-                schedule_type=ScheduleType.INTERVAL,
-                expression=expression,
-                command="echo"
-            )
-            assert schedule is not None
-            # Clean up
-            scheduler.remove_schedule(f"test-{expression}")
+        schedule = scheduler.add_schedule(
+            name=f"test-{expression}",
+            schedule_type=ScheduleType.INTERVAL,
+            expression=expression,
+            command="echo"
+        )
+        assert schedule is not None
+        assert scheduler._parse_interval(expression) == expected_seconds
+    
+    def test_cron_trigger_reused(self, scheduler, mock_process_manager):
+        """Test that schedules sharing a cron expression share one trigger."""
+        scheduler.set_process_manager(mock_process_manager)
+        
+        first = scheduler.add_schedule("a", ScheduleType.CRON, "0 * * * *", "echo")
+        second = scheduler.add_schedule("b", ScheduleType.CRON, "0  *  * * *", "echo")
+        
+        assert scheduler._create_trigger(first) is scheduler._create_trigger(second)
     
     def test_invalid_cron_expression(self, scheduler, mock_process_manager):
         """Test that invalid cron expressions raise error."""
@@ -229,6 +234,8 @@ class TestProcessScheduler:
         
         # Verify process was started
         mock_process_manager.start_process.assert_called()
+        assert schedule.run_count >= 1
+        assert schedule.next_run is not None
         
     def test_schedule_with_environment_vars(self, scheduler, mock_process_manager):
         """Test schedule with environment variables."""
@@ -279,4 +286,15 @@ class TestProcessScheduler:
         scheduler.stop()
         
         # Should only run once, not 5 times
-        assert mock_process_manager.start_process.call_count <= 1
\ No newline at end of file
+        assert mock_process_manager.start_process.call_count <= 1
+
+    def test_enable_retention(self, scheduler):
+        """Test that retention registers a periodic prune job."""
+        from apscheduler.triggers.interval import IntervalTrigger
+        
+        scheduler.enable_retention(7, interval_hours=2)
+        job = scheduler._scheduler.get_job(RETENTION_JOB_ID)
+        assert job is not None
+        assert isinstance(job.trigger, IntervalTrigger)
+        assert job.trigger.interval == timedelta(hours=2)
+        assert job.args == (7,)